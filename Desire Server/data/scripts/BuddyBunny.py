@@ -1,6 +1,7 @@
 import bsSpaz
 import bs
 import bsUtils
+import bsTick
 import weakref
 import random
 
@@ -72,6 +73,11 @@ class BunnyBotSet(bsSpaz.BotSet):
         self._botLists = [[] for i in range(self._botListCount)]
         self._spawnSound = bs.getSound('spawn')
         self._spawningCount = 0
+        # bunnies go after everyone (bots included) but their owner and
+        # their owner's other bunnies
+        self._targetFilter = bs.WeakCall(self._isTarget)
+        self._includeBots = True
+        self._registerBotSet()
         self.startMovingBunnies()
         self.sourcePlayer = sourcePlayer
         
@@ -80,7 +86,7 @@ class BunnyBotSet(bsSpaz.BotSet):
         self.spawnBot(BunnyBuddyBot, self.sourcePlayer.actor.node.position, 2000, self.setupBunny)
         
     def startMovingBunnies(self):
-        self._botUpdateTimer = bs.Timer(50,bs.WeakCall(self._bUpdate),repeat=True)
+        self._botUpdateTimer = bsTick.add(50,bs.WeakCall(self._update),bsTick.PHASE_AI)
         
     def _spawnBot(self,botType,pos,onSpawnCall):
         spaz = botType(self.sourcePlayer)
@@ -92,44 +98,12 @@ class BunnyBotSet(bsSpaz.BotSet):
         self._spawningCount -= 1
         if onSpawnCall is not None: onSpawnCall(spaz)
         
-    def _bUpdate(self):
+    def _isTarget(self, target):
+        if target.player is not None:
+            return not (target.player is self.sourcePlayer)
+        return (target.botSet != id(self)
+                and not (target.sourcePlayer is self.sourcePlayer))
 
-        # update one of our bot lists each time through..
-        # first off, remove dead bots from the list
-        # (we check exists() here instead of dead.. we want to keep them around even if they're just a corpse)
-
-        try:
-            botList = self._botLists[self._botUpdateList] = [b for b in self._botLists[self._botUpdateList] if b.exists()]
-        except Exception:
-            bs.printException("error updating bot list: "+str(self._botLists[self._botUpdateList]))
-        self._botUpdateList = (self._botUpdateList+1)%self._botListCount
-
-        # update our list of player points for the bots to use
-        playerPts = []
-
-        try:
-            #if player.isAlive() and not (player is self.sourcePlayer):
-            #    playerPts.append((bs.Vector(*player.actor.node.position),
-            #                     bs.Vector(*player.actor.node.velocity)))
-            for n in bs.getNodes():
-                if n.getNodeType() == 'spaz':
-                    s = n.getDelegate()
-                    if isinstance(s,bsSpaz.SpazBot):
-                        if not s in self.getLivingBots():
-                            if hasattr(s, 'sourcePlayer'):
-                                if not s.sourcePlayer is self.sourcePlayer:
-                                    playerPts.append((bs.Vector(*n.position), bs.Vector(*n.velocity)))
-                            else:
-                                playerPts.append((bs.Vector(*n.position), bs.Vector(*n.velocity)))
-                    elif isinstance(s, bsSpaz.PlayerSpaz):
-                        if not (s.getPlayer() is self.sourcePlayer):
-                            playerPts.append((bs.Vector(*n.position), bs.Vector(*n.velocity)))
-        except Exception:
-            bs.printException('error on bot-set _update')
-
-        for b in botList:
-            b._setPlayerPts(playerPts)
-            b._updateAI()
     def setupBunny(self, spaz):
         spaz.sourcePlayer = self.sourcePlayer
         spaz.color = self.sourcePlayer.color
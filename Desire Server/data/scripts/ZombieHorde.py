@@ -170,37 +170,13 @@ class PlayerZombie(bs.PlayerSpaz):
         else:
             super(self.__class__, self).handleMessage(m)
             
-class zBotSet(bs.BotSet):   #the botset is overloaded to prevent adding players to the bots' targets if they are zombies too.         
-    def startMoving(self): #here we overload the default startMoving, which normally calls _update.
-        #self._botUpdateTimer = bs.Timer(50,bs.WeakCall(self._update),repeat=True)
-        self._botUpdateTimer = bs.Timer(50,bs.WeakCall(self.zUpdate),repeat=True)
-        
-    def zUpdate(self):
-
-        # update one of our bot lists each time through..
-        # first off, remove dead bots from the list
-        # (we check exists() here instead of dead.. we want to keep them around even if they're just a corpse)
-        #####This is overloaded from bsSpaz to prevent zombies from attacking player Zombies.
-        try:
-            botList = self._botLists[self._botUpdateList] = [b for b in self._botLists[self._botUpdateList] if b.exists()]
-        except Exception:
-            bs.printException("error updating bot list: "+str(self._botLists[self._botUpdateList]))
-        self._botUpdateList = (self._botUpdateList+1)%self._botListCount
+def _isZombieTarget(target):
+    # players who are zombies too (out of lives) aren't attacked
+    return target.player.gameData['lives'] > 0
 
-        # update our list of player points for the bots to use
-        playerPts = []
-        for player in bs.getActivity().players:
-            try:
-                if player.isAlive():
-                    if player.gameData['lives'] > 0:  #If the player has lives, add to attack points
-                        playerPts.append((bs.Vector(*player.actor.node.position),
-                                        bs.Vector(*player.actor.node.velocity)))
-            except Exception:
-                bs.printException('error on bot-set _update')
-
-        for b in botList:
-            b._setPlayerPts(playerPts)
-            b._updateAI()
+class zBotSet(bs.BotSet):   #the botset's targets are filtered to prevent adding players to the bots' targets if they are zombies too.
+    def __init__(self):
+        bs.BotSet.__init__(self, targetFilter=_isZombieTarget)
             
 class ZombieHorde(bs.TeamGameActivity):
 
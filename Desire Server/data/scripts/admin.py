@@ -8,6 +8,7 @@ import time
 import base64
 import os,json
 import bsInternal
+import bsMetrics
 import getPermissionsHashes as gph
 from thread import start_new_thread
 #from VirtualHost import DB_Handler,Language,MainSettings,_execSimpleExpression
@@ -186,6 +187,7 @@ class SurroundBall(bs.Actor):
 class Enhancement(bs.Actor):
     def __init__(self, spaz, player):
         bs.Actor.__init__(self)
+        bsMetrics.trackEffect(self)
         self.sourcePlayer = player
         self.spazRef = weakref.ref(spaz)
         self.spazNormalColor = spaz.node.color
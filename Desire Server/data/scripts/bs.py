@@ -5,6 +5,13 @@ the functionality exposed here is all you should need.
 
 # pull in our 'public' stuff
 from bsInternal import *
+
+# in headless mode, keep client-only modules (bsUI, etc) from loading
+# until something actually uses them
+import bsServerHooks
+bsServerHooks._startImportReport()
+bsServerHooks._installLazyModules()
+
 from bsUtils import getLanguage, writeConfig, openURL, WeakCall, Call, \
     animate, animateArray, Lstr, uni, utf8, playMusic, PopupText, getConfig, \
     getNormalizedColor, isPointInBox, getTimeString, printError, \
@@ -33,7 +40,7 @@ from bsSpaz import SpazFactory, RespawnIcon, Spaz, PlayerSpaz, \
     ToughGuyBotLame, ToughGuyBotPro, ToughGuyBotProShielded, NinjaBot, \
     NinjaBotPro, NinjaBotProShielded, ChickBot, ChickBotStatic, ChickBotPro, \
     ChickBotProShielded, MelBot, MelBotStatic, PirateBot, \
-    PirateBotNoTimeLimit, PirateBotShielded
+    PirateBotNoTimeLimit, PirateBotShielded, BotTarget
 from bsVector import Vector
 
 # change everything's listed module to ours
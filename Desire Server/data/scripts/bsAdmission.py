@@ -0,0 +1,191 @@
+"""
+Admission control for full parties.
+
+When a session is full, clients asking to join get queued instead of just
+turned away. Whenever a slot frees up, it's held for the client at the
+head of the queue for settings.queueReserveTime seconds; they're told to
+hit join, and other clients can't take that slot in the meantime. The
+queue is ordered by tier (owners/admins first, then players ranked in
+the top settings.queueTopRank of the local stats, then everyone else)
+and then by when they first asked. Anyone still waiting after
+settings.queueTimeout seconds (or who disconnects) drops out.
+
+Everything comes from local state (the permissions lists, pStats.json
+and the client registry); getQueue() and getWaitStats() expose queue
+depth and wait times (also shown by /whoinqueue and in the metrics).
+"""
+
+import os
+import json
+import weakref
+import bs
+import bsClients
+import bsMetrics
+import getPermissionsHashes as gph
+import settings
+
+TIER_ADMIN = 0
+TIER_TOP_RANKED = 1
+TIER_DEFAULT = 2
+gTierNames = {TIER_ADMIN:'admin', TIER_TOP_RANKED:'top-ranked',
+              TIER_DEFAULT:'player'}
+
+# clientID -> [tier, time queued (real ms), seq]
+_gQueue = {}
+_gQueueSeq = 0
+# clientID -> time the slot held for them expires (real ms)
+_gReservations = {}
+_gSession = None
+
+# recent waits (seconds) of clients admitted from the queue
+_gWaits = []
+_gMaxWaits = 100
+
+# pStats.json ranks, reloaded when the file changes
+_gRanks = {}
+_gRanksMTime = None
+
+
+def _getSetting(name, default):
+    return getattr(settings, name, default)
+
+
+def _getRank(account):
+    global _gRanks
+    global _gRanksMTime
+    path = bs.getEnvironment()['systemScriptsDirectory'] + '/pStats.json'
+    try:
+        mTime = os.path.getmtime(path)
+        if mTime != _gRanksMTime:
+            f = open(path)
+            try:
+                stats = json.loads(f.read())
+            finally:
+                f.close()
+            _gRanks = dict((aid, int(s['rank'])) for aid, s in stats.items())
+            _gRanksMTime = mTime
+    except Exception:
+        _gRanks = {}
+        _gRanksMTime = None
+    return _gRanks.get(account)
+
+
+def getTier(clientID):
+    """ returns the queue tier for a client """
+    account = bsClients.getAccount(clientID)
+    if account is None:
+        return TIER_DEFAULT
+    if account in gph.ownerHashes or account in gph.admin:
+        return TIER_ADMIN
+    rank = _getRank(account)
+    if rank is not None and rank <= _getSetting('queueTopRank', 10):
+        return TIER_TOP_RANKED
+    return TIER_DEFAULT
+
+
+def getQueue():
+    """ returns (clientID, tier, seconds waited, slot held for them)
+    tuples in queue order """
+    now = bs.getRealTime()
+    return [(clientID, entry[0], (now-entry[1])*0.001,
+             clientID in _gReservations)
+            for clientID, entry in sorted(_gQueue.items(),
+                                          key=lambda e: e[1])]
+
+
+def getWaitStats():
+    """ returns (queue depth, longest current wait, mean wait of recent
+    admissions) with waits in seconds """
+    now = bs.getRealTime()
+    longest = max([(now-e[1])*0.001 for e in _gQueue.values()] or [0.0])
+    mean = sum(_gWaits)/len(_gWaits) if _gWaits else 0.0
+    return len(_gQueue), longest, mean
+
+
+def requestSlot(session, player):
+    """ called when a player asks to join a session; returns whether they
+    may """
+    global _gSession
+    global _gQueueSeq
+    _gSession = weakref.ref(session)
+    clientID = player.getInputDevice().getClientID()
+    now = bs.getRealTime()
+    _expire(now)
+    _fillReservations(session, now)
+
+    if clientID in _gReservations:
+        del _gReservations[clientID]
+        _admitFromQueue(clientID, now)
+        return True
+    # (any slots still free once the queue has been served are up for grabs)
+    if session._maxPlayers - len(session.players) - len(_gReservations) > 0:
+        return True
+
+    if clientID not in _gQueue:
+        _gQueueSeq += 1
+        _gQueue[clientID] = [getTier(clientID), now, _gQueueSeq]
+    position = [e[0] for e in getQueue()].index(clientID) + 1
+    bs.screenMessage('Party is full; you are #' + str(position)
+                     + ' in the queue. You\'ll be told when a slot opens.',
+                     color=(1, 0.6, 0), clients=[clientID], transient=True)
+    return False
+
+
+def _admitFromQueue(clientID, now):
+    entry = _gQueue.pop(clientID, None)
+    if entry is not None:
+        wait = (now-entry[1])*0.001
+        _gWaits.append(wait)
+        if len(_gWaits) > _gMaxWaits:
+            del _gWaits[0]
+        bsMetrics.observe('admission_wait_seconds', wait)
+
+
+def _onSlotFreed(session):
+    """ called when a player leaves a session """
+    if _gQueue:
+        now = bs.getRealTime()
+        _expire(now)
+        _fillReservations(session, now)
+
+
+def _fillReservations(session, now):
+    free = session._maxPlayers - len(session.players) - len(_gReservations)
+    if free <= 0:
+        return
+    reserveTime = int(_getSetting('queueReserveTime', 20) * 1000)
+    for clientID, tier, waited, reserved in getQueue():
+        if free <= 0:
+            break
+        if reserved:
+            continue
+        _gReservations[clientID] = now + reserveTime
+        free -= 1
+        bs.screenMessage('A slot is open for you; press join within '
+                         + str(reserveTime/1000) + ' seconds!',
+                         color=(0, 1, 0), clients=[clientID],
+                         transient=True)
+        with bs.Context('UI'):
+            bs.realTimer(reserveTime+100, _onReservationTimeout)
+
+
+def _expire(now):
+    timeout = _getSetting('queueTimeout', 300) * 1000
+    for clientID, expireTime in _gReservations.items():
+        if now >= expireTime:
+            # (they missed their chance; they'll have to queue again)
+            del _gReservations[clientID]
+            _gQueue.pop(clientID, None)
+    for clientID, entry in _gQueue.items():
+        if now - entry[1] >= timeout or bsClients.getClient(clientID) is None:
+            del _gQueue[clientID]
+            _gReservations.pop(clientID, None)
+
+
+def _onReservationTimeout():
+    # hand the slot on to whoever's next
+    session = None if _gSession is None else _gSession()
+    if session is not None and _gReservations:
+        now = bs.getRealTime()
+        _expire(now)
+        _fillReservations(session, now)
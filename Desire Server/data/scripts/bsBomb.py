@@ -1,5 +1,6 @@
 import bs
 import bsUtils
+import bsTrace
 import bdUtils
 from bsVector import Vector
 import random
@@ -296,6 +297,9 @@ class Blast(bs.Actor):
         Instantiate with given values.
         """
         bs.Actor.__init__(self)
+        if bsTrace.gEnabled:
+            bsTrace.record(bsTrace.EXPLOSION, text=blastType,
+                           values=tuple(position)+(blastRadius,))
         
         factory = Bomb.getFactory()
 
@@ -1,4 +1,5 @@
 import bs
+import bsTick
 import random
 
 
@@ -175,7 +176,7 @@ class CTFGame(bs.TeamGameActivity):
         self.setupStandardTimeLimit(self.settings['Time Limit'])
         self.setupStandardPowerupDrops()
 
-        bs.gameTimer(1000, call=self._tick, repeat=True)
+        self._tickTimer = bsTick.add(1000, self._tick)
 
     def _spawnFlagForTeam(self, team):
         flag = team.gameData['flag'] = CTFFlag(self, team)
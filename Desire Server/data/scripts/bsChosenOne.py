@@ -1,4 +1,5 @@
 import bs
+import bsTick
 
 
 def bsGetAPIVersion():
@@ -105,7 +106,7 @@ class ChosenOneGame(bs.TeamGameActivity):
         self._setChosenOnePlayer(None)
 
         p = self._flagSpawnPos
-        bs.gameTimer(1000, call=self._tick, repeat=True)
+        self._tickTimer = bsTick.add(1000, self._tick)
 
         m = self._resetRegionMaterial = bs.Material()
         m.addActions(
@@ -0,0 +1,257 @@
+"""
+A registry of connected clients keyed by clientID.
+
+Scripts used to find a client's player, account or display string by
+scanning the game roster or a players list, often several times per chat
+message. This keeps that info in a dict instead. Entries are kept current
+by the session's player join/leave hooks (see bsGame.Session) and by
+resyncing with the game roster on each server status tick (which drops
+clients that have left). Clients that are connected but haven't joined
+yet (in the lobby, say) get picked up by a resync when they're looked up,
+but at most once per pass through the game loop, so lookups of departed
+clients stay cheap.
+
+Player names are also indexed in a trie for prefix searches
+(see findClients()).
+"""
+
+import bsInternal
+import bsTrace
+
+
+class ClientInfo(object):
+    """ what we know about one connected client """
+
+    __slots__ = ('clientID', 'displayString', 'account', 'names', 'players')
+
+    def __init__(self, clientID):
+        self.clientID = clientID
+        self.displayString = None
+        self.account = None
+        self.names = ()
+        # (a client can have more than one player if it has several
+        # controllers)
+        self.players = []
+
+    def getPlayer(self):
+        """ returns the client's (first) player, or None """
+        for player in self.players:
+            if player.exists():
+                return player
+        return None
+
+    def getActor(self):
+        """ returns the actor of the client's player, or None """
+        player = self.getPlayer()
+        return None if player is None else player.actor
+
+    def getName(self):
+        """ returns the client's player name (or display string if it has
+        no players yet) """
+        return self.names[0] if self.names else self.displayString
+
+
+class _NameTrie(object):
+    """ maps lowercased names to clientIDs; supports prefix lookups """
+
+    def __init__(self):
+        # each node is a dict of char -> child node; the None key holds the
+        # set of clientIDs with a name passing through that node
+        self._root = {}
+
+    def add(self, name, clientID):
+        node = self._root
+        for char in name.lower():
+            node = node.setdefault(char, {})
+            node.setdefault(None, set()).add(clientID)
+
+    def remove(self, name, clientID):
+        node = self._root
+        path = []
+        for char in name.lower():
+            child = node.get(char)
+            if child is None:
+                return
+            path.append((node, char))
+            node = child
+            node[None].discard(clientID)
+        # prune nodes nobody passes through any more
+        for parent, char in reversed(path):
+            if parent[char][None]:
+                break
+            del parent[char]
+
+    def find(self, prefix):
+        node = self._root
+        for char in prefix.lower():
+            node = node.get(char)
+            if node is None:
+                return set()
+        return set(node.get(None, ()))
+
+
+_gClients = {}
+_gNames = _NameTrie()
+
+# whether a lookup has already resynced with the roster this pass through
+# the game loop
+_gMissRefreshed = False
+
+
+def getClient(clientID):
+    """ returns the ClientInfo for a clientID (or None if not connected) """
+    client = _gClients.get(clientID)
+    # (negative ids are the host and such, which are never in the roster)
+    if client is None and clientID >= 0 and not _gMissRefreshed:
+        _refreshForMiss()
+        client = _gClients.get(clientID)
+    return client
+
+
+def _refreshForMiss():
+    global _gMissRefreshed
+    _gMissRefreshed = True
+    # (the UI context is always around, so this is sure to get cleared)
+    with bsInternal.Context('UI'):
+        bsInternal.pushCall(_clearMissRefreshed)
+    refresh()
+
+
+def _clearMissRefreshed():
+    global _gMissRefreshed
+    _gMissRefreshed = False
+
+
+def getPlayer(clientID):
+    """ returns a client's bs.Player (or None) """
+    client = getClient(clientID)
+    return None if client is None else client.getPlayer()
+
+
+def getActor(clientID):
+    """ returns the actor of a client's player (or None) """
+    client = getClient(clientID)
+    return None if client is None else client.getActor()
+
+
+def getAccount(clientID):
+    """ returns a client's account id (or None) """
+    client = getClient(clientID)
+    if client is None:
+        return None
+    if client.account is None:
+        player = client.getPlayer()
+        if player is not None:
+            client.account = player.get_account_id()
+    return client.account
+
+
+def findClients(name):
+    """ returns ClientInfos of clients with a player name starting with the
+    given string (case-insensitive) """
+    return [_gClients[cid] for cid in _gNames.find(name)
+            if cid in _gClients]
+
+
+def getClients():
+    """ returns all known ClientInfos """
+    return _gClients.values()
+
+
+def refresh():
+    """ resync with the game roster; picks up new clients and names and
+    drops clients that have left """
+    seen = set()
+    for entry in bsInternal._getGameRoster():
+        clientID = entry.get('clientID')
+        if clientID is None:
+            continue
+        seen.add(clientID)
+        _updateFromRosterEntry(_getOrAddClient(clientID), entry)
+    for clientID in _gClients.keys():
+        if clientID not in seen:
+            _removeClient(clientID)
+
+
+def _updateFromRosterEntry(client, entry):
+    client.displayString = entry.get('displayString')
+    _setNames(client, tuple([p['nameFull'] for p in entry.get('players', [])
+                             if p.get('nameFull')]))
+
+
+def _fillFromRoster(client):
+    for entry in bsInternal._getGameRoster():
+        if entry.get('clientID') == client.clientID:
+            _updateFromRosterEntry(client, entry)
+            return
+
+
+def _getOrAddClient(clientID):
+    client = _gClients.get(clientID)
+    if client is None:
+        client = _gClients[clientID] = ClientInfo(clientID)
+    return client
+
+
+def _setNames(client, names):
+    if names != client.names:
+        for name in client.names:
+            _gNames.remove(name, client.clientID)
+        for name in names:
+            _gNames.add(name, client.clientID)
+        client.names = names
+
+
+def _removeClient(clientID):
+    client = _gClients.pop(clientID, None)
+    if client is not None:
+        _setNames(client, ())
+
+
+def _uni(s):
+    # (names can come to us as utf-8 strs)
+    return s.decode('utf-8', 'replace') if isinstance(s, str) else s
+
+
+def _onPlayerJoin(player):
+    """ called when a session accepts a new player """
+    try:
+        clientID = player.getInputDevice().getClientID()
+    except Exception:
+        return
+    client = _getOrAddClient(clientID)
+    client.players = [p for p in client.players if p.exists()]
+    if player not in client.players:
+        client.players.append(player)
+    try:
+        client.account = player.get_account_id()
+    except Exception:
+        pass
+    if client.displayString is None:
+        # fill in who this is now rather than on the next refresh(), so
+        # lookups by display string (spam counters etc) work right away
+        _fillFromRoster(client)
+        if client.displayString is None:
+            try: client.displayString = \
+                    player.getInputDevice()._getAccountName(True)
+            except Exception: pass
+    name = player.getName(full=True)
+    if name and name not in client.names:
+        _setNames(client, client.names+(name,))
+    if bsTrace.gEnabled:
+        bsTrace.record(bsTrace.JOIN, clientID,
+                       _uni(client.account or u'')+u'\0'+_uni(name))
+
+
+def _onPlayerLeave(player):
+    """ called when a player leaves its session """
+    try:
+        clientID = player.getInputDevice().getClientID()
+        clients = [_gClients.get(clientID)]
+        bsTrace.record(bsTrace.LEAVE, clientID)
+    except Exception:
+        clients = _gClients.values()
+    for client in clients:
+        if client is not None and player in client.players:
+            client.players.remove(player)
+            break
@@ -2099,7 +2099,7 @@ class CoopSession(bs.Session):
 
             # generic team games..
             if isinstance(results, bs.TeamGameResults):
-                playerInfo = results._playerInfo
+                playerInfo = results._getPlayerInfo()
                 score = results._getTeamScore(results._getTeams()[0])
                 failMessage = None
                 scoreOrder = ('decreasing' if results._lowerIsBetter
@@ -1,4 +1,5 @@
 import bs
+import bsTick
 import random
 
 
@@ -93,7 +94,7 @@ class EasterEggHuntGame(bs.TeamGameActivity):
         bs.TeamGameActivity.onBegin(self)
         self._updateScoreBoard()
 
-        self._updateTimer = bs.Timer(250, self._update, repeat=True)
+        self._updateTimer = bsTick.add(250, self._update)
 
         self._countdown = bs.OnScreenCountdown(60, endCall=self.endGame)
         bs.gameTimer(4000, self._countdown.start)
@@ -1,4 +1,5 @@
 import bs
+import bsTick
 
 
 def bsGetAPIVersion():
@@ -443,7 +444,7 @@ class EliminationGame(bs.TeamGameActivity):
 
         # we could check game-over conditions at explicit trigger points,
         # but lets just do the simple thing and poll it...
-        bs.gameTimer(1000, self._update, repeat=True)
+        self._updateTimer = bsTick.add(1000, self._update)
 
     def _getTotalTeamLives(self, team):
         return sum(player.gameData['lives'] for player in team.players)
@@ -0,0 +1,775 @@
+"""
+A stand-in for the game's native bsInternal module.
+
+This lets the real bs module and the server scripts (chatCmd, systemm,
+coinSystem, mystats, admin, etc) be imported and exercised under a plain
+python 2.7 - for benchmarks, replays and experiments - without the
+bs_headless binary:
+
+    import bsFakeEngine
+    engine = bsFakeEngine.install()
+    import bs, chatCmd
+    engine.addClient(5, 'Alpha', account='pb-xxx')
+    bsInternal._getForegroundHostActivity()   # engine.activity
+    chatCmd.cmd('/list', 5)
+    engine.advanceTime(2000)   # runs any timers that came due
+    print engine.chatMessages
+
+What's faked: nodes (with attribute storage, delegates, death actions and
+connections; nothing simulates them), timers and calls run off a virtual
+clock that only moves in advanceTime(), contexts, media handles, the
+party roster, clients and their players, and sinks collecting chat and
+screen messages, sounds and disconnects. There's a single host session
+and activity (HostActivity) holding the players; real bs.Session and
+bs.Activity classes can be instantiated but nothing drives them. Any
+other internal (_xxx) call is accepted and returns None.
+"""
+
+import os
+import sys
+import json
+import heapq
+import types
+import weakref
+import tempfile
+import traceback
+import collections
+
+# the one engine instance (see install())
+gEngine = None
+
+# the public engine api; everything else in here is ours
+__all__ = ['Context', 'Node', 'Timer', 'Material', 'Sound', 'Texture',
+           'Model', 'CollideModel', 'Player', 'InputDevice', 'Widget',
+           'SecureInt', 'getEnvironment', 'newNode', 'getNodes',
+           'getActivity', 'getSession', 'newActivity', 'gameTimer',
+           'realTimer', 'netTimer', 'getGameTime', 'getRealTime',
+           'getNetTime', 'pushCall', 'callInGameThread', 'screenMessage',
+           'playSound', 'getSound', 'getTexture', 'getModel',
+           'getCollideModel', 'emitBGDynamics', 'shakeCamera',
+           'getSafeColor', 'getSpecialChar', 'getCollisionInfo',
+           'uniFromInts', 'uniToInts', 'getUIBounds', 'applySettings',
+           'reloadMedia', 'showURL', 'quit', 'widget', 'buttonWidget',
+           'checkBoxWidget', 'columnWidget', 'containerWidget',
+           'hScrollWidget', 'imageWidget', 'rowWidget', 'scrollWidget',
+           'textWidget', 'androidMediaScanFile', 'androidRefreshFiles']
+
+
+class Engine(object):
+    """ state of the fake engine; tests and tools poke at this directly """
+
+    def __init__(self, scriptsDir, configDir):
+        self.environment = {
+            'systemScriptsDirectory': scriptsDir,
+            'userScriptsDirectory': os.path.join(configDir, 'mods'),
+            'configFilePath': os.path.join(configDir, 'config.json'),
+            'platform': 'linux', 'subplatform': 'headless',
+            'locale': 'en_US', 'kioskMode': False, 'debugBuild': False,
+            'testBuild': False, 'buildNumber': 0, 'version': '1.4.155',
+            'interfaceType': 'large', 'userAgentString': 'bsFakeEngine',
+            'vrMode': False, 'toolbarTest': False, 'demoMode': False,
+            'arcadeMode': False, 'iircadeMode': False}
+
+        # virtual time in ms (game, real and net time all move together)
+        self.time = 0
+        # heap of [due, seq, call, interval, context, timer weakref]
+        self._timers = []
+        self._timerSeq = 0
+        self._contextStack = [None]
+
+        self.nodes = []
+        self.activity = HostActivity()
+        self.session = self.activity.getSession()
+
+        # clientID -> roster entry
+        self.clients = collections.OrderedDict()
+        self.clients[-1] = {'clientID': -1, 'displayString': u'Server',
+                            'specString': u'', 'players': []}
+        self.party = {'enabled': False, 'name': u'', 'maxSize': 8,
+                      'statsURL': u''}
+
+        # sinks (only recent messages are kept; the counts are totals)
+        self.chatMessages = collections.deque(maxlen=1000)
+        self.screenMessages = collections.deque(maxlen=1000)
+        self.counts = collections.defaultdict(int)
+        self.disconnected = []
+        self.errors = []
+        self.quitRequested = False
+
+    # clock
+
+    def advanceTime(self, ms):
+        """ move the clock forward, running any timers that come due """
+        end = self.time + ms
+        while self._timers and self._timers[0][0] <= end:
+            entry = heapq.heappop(self._timers)
+            due, seq, call, interval, context, timerRef = entry
+            if timerRef is not None and timerRef() is None:
+                continue
+            self.time = due
+            if interval is not None:
+                self._timerSeq += 1
+                entry[0] += max(interval, 1)
+                entry[1] = self._timerSeq
+                heapq.heappush(self._timers, entry)
+            self._runCall(call, context)
+        self.time = end
+
+    def runPending(self):
+        """ run anything due now (pushed calls, zero-length timers) """
+        self.advanceTime(0)
+
+    def _schedule(self, ms, call, repeat=False, timer=None):
+        self._timerSeq += 1
+        heapq.heappush(self._timers, [
+            self.time + max(int(ms), 0), self._timerSeq, call,
+            int(ms) if repeat else None, self._contextStack[-1],
+            None if timer is None else weakref.ref(timer)])
+
+    def _runCall(self, call, context):
+        self._contextStack.append(context)
+        try:
+            call()
+        except Exception:
+            # (like the real engine; print it and carry on)
+            self.errors.append(sys.exc_info()[1])
+            traceback.print_exc()
+        finally:
+            self._contextStack.pop()
+
+    # clients
+
+    def addClient(self, clientID, name, account=None, playerCount=1):
+        """ connect a client with the given number of players; returns its
+        players """
+        players = [Player(clientID, name, account)
+                   for i in range(playerCount)]
+        self.clients[clientID] = {
+            'clientID': clientID, 'displayString': name, 'specString': u'',
+            'players': [{'name': p.getName(), 'nameFull': p.getName(True),
+                         'id': p.getID()} for p in players]}
+        self.activity.players.extend(players)
+        for player in players:
+            self.session._onPlayerJoin(player)
+        return players
+
+    def removeClient(self, clientID):
+        """ disconnect a client """
+        self.clients.pop(clientID, None)
+        for player in [p for p in self.activity.players
+                       if p._clientID == clientID]:
+            self.activity.players.remove(player)
+            self.session._onPlayerLeave(player)
+            player._exists = False
+
+
+class _FakeBSInternal(types.ModuleType):
+    """ the installed bsInternal module; internal calls it doesn't define
+    are accepted and do nothing """
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return _noop
+
+
+def _noop(*args, **keywds):
+    return None
+
+
+def install(scriptsDir=None, configDir=None):
+    """
+    Install the fake engine as bsInternal (the real bs module can then be
+    imported) and return the Engine. scriptsDir defaults to this file's
+    dir; configDir (where the game config, server status, etc go) to a new
+    temp dir.
+    """
+    global gEngine
+    if scriptsDir is None:
+        scriptsDir = os.path.dirname(os.path.abspath(__file__))
+    if configDir is None:
+        configDir = tempfile.mkdtemp(prefix='bsfake-')
+    gEngine = Engine(scriptsDir, configDir)
+    module = _FakeBSInternal('bsInternal')
+    thisModule = sys.modules[__name__]
+    for name in __all__:
+        setattr(module, name, getattr(thisModule, name))
+    for name, value in _gInternals.items():
+        setattr(module, name, value)
+    module.__all__ = list(__all__)
+    sys.modules['bsInternal'] = module
+    if scriptsDir not in sys.path:
+        sys.path.insert(0, scriptsDir)
+    # (the real game reads its config once bs is up)
+    import bs
+    import bsUtils
+    bsUtils._readConfig()
+    return gEngine
+
+
+# contexts
+
+class Context(object):
+    """ see bs.Context; targets can be activities, sessions, 'UI',
+    'current' or None """
+
+    def __init__(self, target):
+        if target == 'current':
+            target = gEngine._contextStack[-1]
+        elif isinstance(target, basestring) or target is None:
+            target = None
+        self._target = target
+
+    def __enter__(self):
+        gEngine._contextStack.append(self._target)
+        return self
+
+    def __exit__(self, excType, excValue, tb):
+        gEngine._contextStack.pop()
+        return False
+
+
+def _isActivity(obj):
+    return getattr(obj, '_activityData', None) is not None
+
+
+def getActivity(exceptionOnNone=True):
+    target = gEngine._contextStack[-1]
+    if _isActivity(target):
+        return target
+    if exceptionOnNone:
+        raise Exception('no current activity')
+    return None
+
+
+def getSession(exceptionOnNone=True):
+    target = gEngine._contextStack[-1]
+    if _isActivity(target):
+        target = target.getSession()
+    if getattr(target, '_sessionData', None) is not None:
+        return target
+    if exceptionOnNone:
+        raise Exception('no current session')
+    return None
+
+
+def newActivity(activityType, settings={}):
+    with Context(getSession()):
+        return activityType(settings)
+
+
+class _HostSession(object):
+    """ the host session behind HostActivity """
+
+    def __init__(self):
+        self._sessionData = object()
+        self.players = []
+        self.teams = []
+
+    def _onPlayerJoin(self, player):
+        self.players.append(player)
+        import bsClients
+        bsClients._onPlayerJoin(player)
+
+    def _onPlayerLeave(self, player):
+        if player in self.players:
+            self.players.remove(player)
+        import bsClients
+        bsClients._onPlayerLeave(player)
+
+
+class HostActivity(object):
+    """ stands in for the foreground host activity """
+
+    def __init__(self):
+        self._activityData = object()
+        self._session = _HostSession()
+        self.players = []
+        self.teams = []
+        self.settings = {}
+
+    def getSession(self):
+        return self._session
+
+    def isFinalized(self):
+        return False
+
+    def hasBegun(self):
+        return True
+
+    def hasEnded(self):
+        return False
+
+
+# nodes
+
+class Node(object):
+    """ see bs.Node; stores attributes and connections but doesn't simulate
+    anything """
+
+    # (what unset attributes read as)
+    _gDefaults = {'position': (0.0, 0.0, 0.0), 'velocity': (0.0, 0.0, 0.0),
+                  'color': (1.0, 1.0, 1.0), 'scale': 1.0, 'opacity': 1.0,
+                  'text': u'', 'hurt': 0.0, 'invincible': False,
+                  'frozen': False, 'knockout': 0.0}
+
+    def __init__(self, nodeType, owner=None, attrs=None, delegate=None,
+                 name=None):
+        d = self.__dict__
+        d['_type'] = nodeType
+        d['_exists'] = nodeType is not None
+        d['_owner'] = owner
+        d['_delegate'] = (None if delegate is None
+                          else weakref.ref(delegate))
+        d['_name'] = name
+        d['_attrs'] = dict(attrs or {})
+        d['_connections'] = {}
+        d['_deathActions'] = []
+
+    def __getattr__(self, attr):
+        # (only called for attrs not in our own dict)
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        attrs = self.__dict__['_attrs']
+        if attr in attrs:
+            return attrs[attr]
+        return self._gDefaults.get(attr)
+
+    def __setattr__(self, attr, value):
+        self._attrs[attr] = value
+        self._connections.pop(attr, None)
+
+    def __nonzero__(self):
+        return self._exists
+
+    def __repr__(self):
+        return '<fake bs.Node ' + repr(self._type) + '>'
+
+    def exists(self):
+        return self._exists
+
+    def getNodeType(self):
+        return self._type
+
+    def getName(self):
+        return self._name
+
+    def getDelegate(self):
+        return None if self._delegate is None else self._delegate()
+
+    def connectAttr(self, srcAttr, dstNode, dstAttr):
+        dstNode._connections[dstAttr] = (weakref.ref(self), srcAttr)
+
+    def handleMessage(self, *args):
+        gEngine.counts['nodeMessages'] += 1
+
+    def addDeathAction(self, call):
+        self._deathActions.append(call)
+
+    def delete(self, ignoreMissing=True):
+        if not self._exists:
+            if not ignoreMissing:
+                raise Exception('node does not exist')
+            return
+        self.__dict__['_exists'] = False
+        try:
+            gEngine.nodes.remove(self)
+        except ValueError:
+            pass
+        for call in self._deathActions:
+            gEngine._runCall(call, gEngine._contextStack[-1])
+        del self._deathActions[:]
+
+
+def newNode(nodeType, owner=None, attrs=None, delegate=None, name=None):
+    node = Node(nodeType, owner, attrs, delegate, name)
+    gEngine.nodes.append(node)
+    gEngine.counts['nodesCreated'] += 1
+    return node
+
+
+def getNodes():
+    return list(gEngine.nodes)
+
+
+# timers
+
+class Timer(object):
+    """ see bs.Timer; cancelled when it dies """
+
+    def __init__(self, time, call, repeat=False, timeType='game'):
+        gEngine._schedule(time, call, repeat, self)
+
+
+def gameTimer(time, call, repeat=False):
+    gEngine._schedule(time, call, repeat)
+
+
+realTimer = gameTimer
+netTimer = gameTimer
+
+
+def getGameTime():
+    return gEngine.time
+
+
+getRealTime = getGameTime
+getNetTime = getGameTime
+
+
+def pushCall(call):
+    gEngine._schedule(0, call)
+
+
+callInGameThread = pushCall
+
+
+# players
+
+class InputDevice(object):
+
+    def __init__(self, clientID, player):
+        self._clientID = clientID
+        self._player = weakref.ref(player)
+
+    def getClientID(self):
+        return self._clientID
+
+    def getPlayer(self):
+        return self._player()
+
+    def exists(self):
+        return self._player() is not None
+
+    def isRemoteClient(self):
+        return self._clientID != -1
+
+
+class Player(object):
+    """ see bs.Player """
+
+    _gNextID = 0
+
+    def __init__(self, clientID, name, account=None):
+        self._clientID = clientID
+        self._name = name
+        self._account = account
+        self._exists = True
+        self._id = Player._gNextID
+        Player._gNextID += 1
+        self._inputDevice = InputDevice(clientID, self)
+        self.actor = None
+        self.character = u'Spaz'
+        self.color = (1.0, 1.0, 1.0)
+        self.highlight = (1.0, 1.0, 1.0)
+        self.gameData = {}
+        self.sessionData = {}
+        self._team = None
+
+    def __nonzero__(self):
+        return self._exists
+
+    def exists(self):
+        return self._exists
+
+    def getName(self, full=False, icon=True):
+        return self._name
+
+    def getID(self):
+        return self._id
+
+    def getInputDevice(self):
+        return self._inputDevice
+
+    def get_account_id(self):
+        return self._account
+
+    def getTeam(self):
+        return self._team
+
+    def setActor(self, actor):
+        self.actor = actor
+
+    def isAlive(self):
+        return self.actor is not None and self.actor.isAlive()
+
+    def getIcon(self):
+        return {'texture': getTexture('neoSpazIcon'),
+                'tintTexture': getTexture('neoSpazIconColorMask'),
+                'tintColor': self.color, 'tint2Color': self.highlight}
+
+    def assignInputCall(self, inputType, call):
+        pass
+
+    def resetInput(self):
+        pass
+
+    def removeFromGame(self):
+        gEngine.removeClient(self._clientID)
+
+
+class SecureInt(object):
+    """ see bs.SecureInt """
+
+    def __init__(self, value):
+        self._value = value
+
+    def get(self):
+        return self._value
+
+    def set(self, value):
+        self._value = value
+
+
+# media and messages
+
+class _Media(object):
+
+    def __init__(self, name):
+        self._name = name
+
+    def __repr__(self):
+        return '<fake bs.' + type(self).__name__ + ' ' + repr(self._name) + '>'
+
+
+class Sound(_Media):
+    pass
+
+
+class Texture(_Media):
+    pass
+
+
+class Model(_Media):
+    pass
+
+
+class CollideModel(_Media):
+    pass
+
+
+class Widget(_Media):
+    pass
+
+
+class Material(object):
+    """ see bs.Material; records the actions added to it """
+
+    def __init__(self, label=None):
+        self.label = label
+        self.actions = []
+
+    def addActions(self, conditions=None, actions=None):
+        self.actions.append((conditions, actions))
+
+
+_gMedia = {}
+
+
+def _getMedia(mediaType, name):
+    media = _gMedia.get((mediaType, name))
+    if media is None:
+        media = _gMedia[(mediaType, name)] = mediaType(name)
+    return media
+
+
+def getSound(name):
+    return _getMedia(Sound, name)
+
+
+def getTexture(name):
+    return _getMedia(Texture, name)
+
+
+def getModel(name):
+    return _getMedia(Model, name)
+
+
+def getCollideModel(name):
+    return _getMedia(CollideModel, name)
+
+
+def playSound(sound, volume=1.0, position=None, hostOnly=False):
+    gEngine.counts['soundsPlayed'] += 1
+
+
+def screenMessage(message, color=None, top=False, image=None, log=False,
+                  clients=None, transient=False):
+    gEngine.counts['screenMessages'] += 1
+    gEngine.screenMessages.append((message, clients))
+
+
+def getEnvironment():
+    return gEngine.environment
+
+
+def emitBGDynamics(*args, **keywds):
+    gEngine.counts['bgDynamics'] += 1
+
+
+def shakeCamera(intensity=1.0):
+    pass
+
+
+def getSafeColor(color, targetIntensity=0.6):
+    return tuple(color)
+
+
+def getSpecialChar(name):
+    # (the real ones are private-use glyphs from the game's font)
+    return unichr(0xe000 + hash(name) % 0x100)
+
+
+def getCollisionInfo(*args):
+    raise Exception('no collision in progress')
+
+
+def uniFromInts(ints):
+    return u''.join([unichr(i) for i in ints])
+
+
+def uniToInts(string):
+    return [ord(c) for c in string]
+
+
+def getUIBounds():
+    return (-640.0, 640.0, -360.0, 360.0)
+
+
+def applySettings():
+    pass
+
+
+def reloadMedia():
+    pass
+
+
+def showURL(address):
+    pass
+
+
+def quit(soft=False, back=False):
+    gEngine.quitRequested = True
+
+
+def widget(*args, **keywds):
+    return None
+
+
+buttonWidget = checkBoxWidget = columnWidget = containerWidget = widget
+hScrollWidget = imageWidget = rowWidget = scrollWidget = textWidget = widget
+
+
+def androidMediaScanFile(path):
+    pass
+
+
+def androidRefreshFiles():
+    pass
+
+
+# internals the scripts care about the results of
+
+def _getGameRoster():
+    return [dict(c) for c in gEngine.clients.values()]
+
+
+def _chatMessage(message):
+    gEngine.counts['chatMessages'] += 1
+    gEngine.chatMessages.append(message)
+
+
+def _getChatMessages():
+    return list(gEngine.chatMessages)
+
+
+def _disconnectClient(clientID, banTime=300):
+    gEngine.disconnected.append(clientID)
+    gEngine.removeClient(clientID)
+
+
+def _getForegroundHostActivity():
+    return gEngine.activity
+
+
+def _getForegroundHostSession():
+    return gEngine.session
+
+
+def _registerSession(session):
+    return object()
+
+
+def _registerActivity(activity):
+    return object()
+
+
+def _getAccountState():
+    return 'SIGNED_OUT'
+
+
+def _getAccountMiscReadVal(name, default):
+    return default
+
+
+def _getLowLevelConfigValue(name, default):
+    return default
+
+
+def _haveConnectedClients():
+    return len(gEngine.clients) > 1
+
+
+def _getGamePort():
+    return 43210
+
+
+def _setPublicPartyEnabled(enabled):
+    gEngine.party['enabled'] = enabled
+
+
+def _getPublicPartyEnabled():
+    return gEngine.party['enabled']
+
+
+def _setPublicPartyName(name):
+    gEngine.party['name'] = name
+
+
+def _setPublicPartyMaxSize(size):
+    gEngine.party['maxSize'] = size
+
+
+def _getPublicPartyMaxSize():
+    return gEngine.party['maxSize']
+
+
+def _setPublicPartyStatsURL(url):
+    gEngine.party['statsURL'] = url
+
+
+def _evaluateLstr(lstrJson):
+    # no translations here; values and fallbacks only
+    def evaluate(args):
+        if 'v' in args:
+            value = args['v']
+        elif 'r' in args:
+            value = args.get('f', args['r'])
+        elif 't' in args:
+            value = args['t'][1]
+        else:
+            value = u''
+        for key, sub in args.get('s', []):
+            value = value.replace(key, sub if isinstance(sub, basestring)
+                                  else evaluate(sub))
+        return value
+    try:
+        return evaluate(json.loads(lstrJson))
+    except Exception:
+        return lstrJson
+
+
+_gInternals = dict((name, value) for name, value in globals().items()
+                   if name.startswith('_') and not name.startswith('__')
+                   and isinstance(value, types.FunctionType)
+                   and name not in ('_noop', '_isActivity', '_getMedia'))
@@ -4,6 +4,8 @@ from bsVector import Vector
 import weakref
 import random
 import bsUtils
+import bsClients
+import bsAdmission
 import time
 import settings
 
@@ -343,6 +345,7 @@ class Actor(object):
 
         # update; we now *always* add a weak-ref...
         activity._addActorWeakRef(self)
+        bsUtils._gcTrackObject(self)
 
     def __del__(self):
         try:
@@ -509,6 +512,7 @@ class Session(object):
 
         # first thing, generate our link to our C layer equivalent..
         self._sessionData = bsInternal._registerSession(self)
+        bsUtils._gcTrackObject(self)
 
         self._useTeams = (teamNames is not None)
         self._useTeamColors = useTeamColors
@@ -565,7 +569,8 @@ class Session(object):
         # stress test
         if bsUtils._gStressTestResetTimer is None:
 
-            if len(self.players) >= self._maxPlayers:
+            # (queues them if we're full)
+            if not bsAdmission.requestSlot(self, player):
 
                 # print a rejection message *only* to the client trying to join
                 # (prevents spamming everyone else in the game)
@@ -580,12 +585,15 @@ class Session(object):
                 return False
 
         bs.playSound(bs.getSound('dripity'))
+        bsClients._onPlayerJoin(player)
         return True
 
     def onPlayerLeave(self, player):
         """
         Called when a previously-accepted bs.Player leaves the session.
         """
+        bsClients._onPlayerLeave(player)
+
         # remove them from the game rosters
         if player in self.players:
 
@@ -705,6 +713,7 @@ class Session(object):
 
             # now remove them from the session list
             self.players.remove(player)
+            bsAdmission._onSlotFreed(self)
 
         else:
             print ('ERROR: Session.onPlayerLeave called'
@@ -1162,6 +1171,7 @@ class Activity(object):
 
         # first thing, generate our link to our C layer equivalent.
         self._activityData = bsInternal._registerActivity(self)
+        bsUtils._gcTrackObject(self)
         session = bs.getSession()
         self._session = weakref.ref(session)
 
@@ -1302,6 +1312,7 @@ class Activity(object):
 
         # since we're mostly between activities at this point, lets run a cycle
         # of garbage collection; hopefully it won't cause hitches here
+        # (in managed gc mode this just schedules work for the slice timer)
         bsUtils.garbageCollect(sessionEnd=False)
 
         # now that our object is officially gonna be dead, tell the session to
@@ -1889,6 +1900,7 @@ class ScoreScreenActivity(Activity):
         self._inheritsCameraVROffset = True
         self._useFixedVROverlay = True
         self._allowServerRestart = False
+        bsUtils._noteServerScoreScreen()
 
     def onPlayerJoin(self, player):
         Activity.onPlayerJoin(self, player)
@@ -1926,6 +1938,7 @@ class ScoreScreenActivity(Activity):
                             + time.strftime('%c')
                     with bs.Context('UI'):
                         bs.realTimer(2000, bs.quit)
+                    bsUtils._gServerQuitting = True
                     self._kickedOffServerShutdown = True
                     return
             else:
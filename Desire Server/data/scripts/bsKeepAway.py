@@ -1,4 +1,5 @@
 import bs
+import bsTick
 
 def bsGetAPIVersion():
     # see bombsquadgame.com/apichanges
@@ -78,7 +79,7 @@ class KeepAwayGame(bs.TeamGameActivity):
         self.setupStandardPowerupDrops()
         self._flagSpawnPos = self.getMap().getFlagPosition(None)
         self._spawnFlag()
-        self._updateTimer = bs.Timer(1000,call=self._tick,repeat=True)
+        self._updateTimer = bsTick.add(1000,self._tick)
         self._updateFlagState()
         self.projectFlagStand(self._flagSpawnPos)
 
@@ -1,4 +1,5 @@
 import bs
+import bsTick
 import weakref
 
 
@@ -108,7 +109,7 @@ class KingOfTheHillGame(bs.TeamGameActivity):
         self.setupStandardTimeLimit(self.settings['Time Limit'])
         self.setupStandardPowerupDrops()
         self._flagPos = self.getMap().getFlagPosition(None)
-        bs.gameTimer(1000, self._tick, repeat=True)
+        self._tickTimer = bsTick.add(1000, self._tick)
         self._flagState = self.FLAG_NEW
         self.projectFlagStand(self._flagPos)
 
@@ -0,0 +1,183 @@
+"""
+Structured, asynchronous logging for server scripts.
+
+log() just appends a record to a queue and returns, so the game thread
+never waits on stdout; a background thread sleeps until there's something
+in the queue (log() only has to wake it if it's asleep), then writes the
+records out as json lines (which the server wrapper captures into its
+logs).
+
+Each category has its own level (gLevels; the server config can set these
+via 'logLevels', e.g. {'chat': 'warning'}), and any one message that keeps
+repeating only gets written gRateLimit times per gRateWindow seconds; the
+writer thread counts the repeats and reports them in a single record once
+the window is up.
+"""
+
+import sys
+import time
+import json
+import threading
+import collections
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+_gLevelNames = {DEBUG:'debug', INFO:'info', WARNING:'warning', ERROR:'error'}
+
+gDefaultLevel = INFO
+# category -> level
+gLevels = {}
+
+gRateLimit = 5
+gRateWindow = 10.0
+
+# (appends and pops on a deque are atomic, so nobody needs to lock)
+# if the writer ever falls this far behind, the oldest records get dropped
+_gQueue = collections.deque(maxlen=10000)
+
+# set when there's something in the queue; the writer thread sleeps on it
+_gWake = threading.Event()
+
+# (category, event, message, clientID, account) ->
+# [window start, count, level name]; only touched by the writer thread,
+# which does the rate-limiting so log() doesn't have to
+_gRepeats = {}
+# (when the first window with suppressed repeats in it is up)
+_gNextExpire = None
+
+_gThread = None
+_gThreadLock = threading.Lock()
+
+
+def setLevels(levels):
+    """ set per-category levels from a dict of category to level (either a
+    level number or a name such as 'warning') """
+    names = dict((name, level) for level, name in _gLevelNames.items())
+    gLevels.clear()
+    for category, level in levels.items():
+        gLevels[category] = names.get(level, level)
+
+
+def isEnabledFor(category, level=INFO):
+    return level >= gLevels.get(category, gDefaultLevel)
+
+
+def log(category, event, message=None, level=INFO, clientID=None,
+        account=None, **fields):
+    """
+    Log an event. Any extra keyword args are included in the record
+    (use 'ms' for durations).
+    """
+    if level < gLevels.get(category, gDefaultLevel):
+        return
+    record = {'time':round(time.time(), 3),
+              'level':_gLevelNames.get(level, level),
+              'category':category, 'event':event}
+    if message is not None:
+        record['message'] = message
+    if clientID is not None:
+        record['clientID'] = clientID
+    if account is not None:
+        record['account'] = account
+    record.update(fields)
+    _push(record)
+
+
+def _push(record):
+    global _gThread
+    _gQueue.append(record)
+    # (only bother the event when the writer might be asleep)
+    if not _gWake.is_set():
+        _gWake.set()
+    if _gThread is None:
+        with _gThreadLock:
+            if _gThread is None:
+                _gThread = threading.Thread(target=_writeRecords)
+                _gThread.daemon = True
+                _gThread.start()
+
+
+def _isSuppressed(record, out):
+    """ counts a record against its message's rate limit; returns True if
+    it shouldn't be written (writer thread only) """
+    global _gNextExpire
+    now = record['time']
+    key = (record['category'], record['event'], record.get('message'),
+           record.get('clientID'), record.get('account'))
+    repeat = _gRepeats.get(key)
+    if repeat is None or now - repeat[0] > gRateWindow:
+        if repeat is not None:
+            _reportRepeats(key, repeat, now, out)
+        if len(_gRepeats) > 1000:
+            _expireRepeats(now, out)
+        repeat = _gRepeats[key] = [now, 0, record['level']]
+    repeat[1] += 1
+    if repeat[1] <= gRateLimit:
+        return False
+    expire = repeat[0] + gRateWindow
+    if _gNextExpire is None or expire < _gNextExpire:
+        _gNextExpire = expire
+    return True
+
+
+def _reportRepeats(key, repeat, now, out):
+    # note how many times a message got suppressed in its window (if any)
+    if repeat[1] > gRateLimit:
+        category, event, message, clientID, account = key
+        out.append({'time':round(now, 3), 'level':repeat[2],
+                    'category':category, 'event':'suppressed',
+                    'message':message, 'suppressedEvent':event,
+                    'clientID':clientID, 'account':account,
+                    'count':repeat[1]-gRateLimit})
+
+
+def _expireRepeats(now, out):
+    global _gNextExpire
+    _gNextExpire = None
+    for key, repeat in _gRepeats.items():
+        expire = repeat[0] + gRateWindow
+        if now > expire:
+            _reportRepeats(key, repeat, now, out)
+            del _gRepeats[key]
+        elif repeat[1] > gRateLimit and (_gNextExpire is None
+                                         or expire < _gNextExpire):
+            _gNextExpire = expire
+
+
+def _writeRecords():
+    while True:
+        # sleep until there's something to write, or until suppressed
+        # repeats need reporting (even if the message never comes again)
+        if _gNextExpire is None:
+            _gWake.wait()
+        else:
+            _gWake.wait(max(0.0, _gNextExpire-time.time()))
+        # (clear before draining, so anything pushed from here on
+        # wakes us again)
+        _gWake.clear()
+        records = []
+        while _gQueue:
+            record = _gQueue.popleft()
+            if not _isSuppressed(record, records):
+                records.append(record)
+        now = time.time()
+        if _gNextExpire is not None and now > _gNextExpire:
+            _expireRepeats(now, records)
+        if not records:
+            continue
+        lines = []
+        for record in records:
+            try:
+                lines.append(json.dumps(record))
+            except Exception:
+                lines.append(json.dumps({'time':record.get('time'),
+                                         'level':'error', 'category':'log',
+                                         'event':'badRecord',
+                                         'message':repr(record)}))
+        try:
+            sys.stdout.write('\n'.join(lines)+'\n')
+            sys.stdout.flush()
+        except Exception:
+            pass
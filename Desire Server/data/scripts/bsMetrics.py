@@ -0,0 +1,126 @@
+"""
+Cheap counters for keeping an eye on a running server.
+
+Scripts record things with inc() and observe(); these do nothing unless
+the server config turns metrics on ('metrics': True, which the server
+wrapper sets when it has a metrics port to serve them on). While enabled,
+the server status tick samples a few gauges (players connected, effect
+timers alive, gc pauses) and writes everything out with its status, where
+the wrapper picks it up and serves it in prometheus text format.
+"""
+
+import weakref
+import bs
+
+gEnabled = False
+
+# (name, labels) -> value; labels being a tuple of (name, value) pairs
+_gCounters = {}
+_gGauges = {}
+# (name, labels) -> [count, sum, max]
+_gSummaries = {}
+
+# live effect actors (admin.Enhancement) whose timers we count
+_gEffects = weakref.WeakSet()
+
+_gOrigNewNode = None
+
+
+def setEnabled(enabled):
+    """ turn metrics collection on or off """
+    global gEnabled
+    global _gOrigNewNode
+    enabled = bool(enabled)
+    if enabled == gEnabled:
+        return
+    gEnabled = enabled
+
+    # count node creation by wrapping bs.newNode (only while enabled so it
+    # costs nothing otherwise)
+    if enabled:
+        _gOrigNewNode = bs.newNode
+        bs.newNode = _countingNewNode
+    else:
+        if bs.newNode is _countingNewNode:
+            bs.newNode = _gOrigNewNode
+        _gOrigNewNode = None
+        _gCounters.clear()
+        _gGauges.clear()
+        _gSummaries.clear()
+        _gEffects.clear()
+
+
+def inc(name, labels=(), amount=1):
+    """ add to a counter """
+    if gEnabled:
+        key = (name, labels)
+        _gCounters[key] = _gCounters.get(key, 0) + amount
+
+
+def observe(name, value, labels=()):
+    """ record a measurement (a duration in seconds, etc) """
+    if gEnabled:
+        key = (name, labels)
+        summary = _gSummaries.get(key)
+        if summary is None:
+            _gSummaries[key] = [1, value, value]
+        else:
+            summary[0] += 1
+            summary[1] += value
+            if value > summary[2]:
+                summary[2] = value
+
+
+def trackEffect(effect):
+    """ include an effect actor's timers in the effect_timers_alive gauge """
+    if gEnabled:
+        _gEffects.add(effect)
+
+
+def _countingNewNode(*args, **keywds):
+    node = _gOrigNewNode(*args, **keywds)
+    activity = bs.getActivity(exceptionOnNone=False)
+    inc('nodes_created_total',
+        (('activity', type(activity).__name__
+          if activity is not None else 'none'),))
+    return node
+
+
+def _sample(partySize):
+    """ update our gauges; called from the server status tick """
+    import bsUtils
+    import bsAdmission
+    import bsPreload
+    _gGauges[('players_connected', ())] = partySize
+    depth, longestWait, meanWait = bsAdmission.getWaitStats()
+    _gGauges[('admission_queue_depth', ())] = depth
+    _gGauges[('admission_longest_wait_seconds', ())] = longestWait
+    _gGauges[('preload_resident_bytes', ())] = bsPreload.getResidentBytes()
+    effects = list(_gEffects)
+    _gGauges[('effects_alive', ())] = len(effects)
+    _gGauges[('effect_timers_alive', ())] = sum(
+        [len([v for v in e.__dict__.values() if isinstance(v, bs.Timer)])
+         for e in effects])
+    stats = bsUtils._gGCStats
+    for gen in range(3):
+        labels = (('generation', str(gen)),)
+        _gGauges[('gc_collections_total', labels)] = \
+            stats['collections'][gen]
+        _gGauges[('gc_collected_total', labels)] = stats['collected'][gen]
+    _gGauges[('gc_pause_seconds_total', ())] = stats['pauseTotal']*0.001
+    _gGauges[('gc_pause_max_seconds', ())] = stats['pauseMax']*0.001
+
+
+def _getMetrics():
+    """ return our current values as a json-friendly list of
+    [name, type, labels, value] entries """
+    metrics = []
+    for (name, labels), value in _gCounters.items():
+        metrics.append([name, 'counter', dict(labels), value])
+    for (name, labels), value in _gGauges.items():
+        metrics.append([name, 'counter' if name.endswith('_total')
+                        else 'gauge', dict(labels), value])
+    for (name, labels), (count, total, maximum) in _gSummaries.items():
+        metrics.append([name, 'summary', dict(labels),
+                        {'count':count, 'sum':total, 'max':maximum}])
+    return metrics
@@ -1,6 +1,7 @@
 import bs
 import random
 import bsUtils
+import bsTrace
 import hack
 import BuddyBunny
 
@@ -244,6 +245,9 @@ class Powerup(bs.Actor): #By Desire
 
         factory = self.getFactory()
         self.powerupType = powerupType;
+        if bsTrace.gEnabled:
+            bsTrace.record(bsTrace.POWERUP, text=powerupType,
+                           values=tuple(position))
         self._powersGiven = False
 
         if powerupType == 'tripleBombs': 
@@ -0,0 +1,153 @@
+"""
+Warms up media for upcoming games while the score screen is showing.
+
+The next game in a team/ffa session gets instantiated a round ahead of
+time (so its map is loaded), but factories (spazzes, bombs, powerups,
+portal gadgets) only load their media the first time something asks for
+them mid-game, which is what causes hitches on the first explosion or
+powerup. planPreload() is called as a session heads into its score screen
+and, in the next game's context, creates those factories, loads the
+characters of everyone currently in the party, and preloads the maps of
+the settings.preloadLookahead games after that (peeking at the session's
+ShuffleList).
+
+We hold on to the media we loaded so it stays resident between rounds;
+anything not needed in the last settings.preloadKeepRounds rounds is let
+go, as is the least recently needed media while our (estimated) total is
+over settings.preloadBudgetMB.
+"""
+
+import sys
+import time
+import bs
+import bsMap
+import bsMetrics
+import settings
+
+# factories to warm: (module, class with a getFactory() classmethod);
+# modules nobody has imported are skipped
+gFactories = [('bsSpaz', 'Spaz'),
+              ('bsBomb', 'Bomb'),
+              ('bsPowerup', 'Powerup'),
+              ('portalObjects', 'Lego')]
+
+# rough sizes (bytes) of media once loaded, for keeping to the budget
+gMediaCosts = {bs.Texture: 512*1024,
+               bs.Model: 128*1024,
+               bs.CollideModel: 64*1024,
+               bs.Sound: 64*1024}
+
+# key ('map:Rampage', 'character:Spaz', 'factory:bsBomb.Bomb'...) ->
+# [last round needed, estimated bytes, media refs]
+_gResident = {}
+_gRound = 0
+
+
+def _getSetting(name, default):
+    return getattr(settings, name, default)
+
+
+def _collectMedia(obj, media, depth=0):
+    # pull media refs out of factories/preload data
+    if type(obj) in gMediaCosts:
+        media.append(obj)
+    elif depth > 3:
+        return
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            _collectMedia(value, media, depth+1)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            _collectMedia(value, media, depth+1)
+    elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+        _collectMedia(obj.__dict__, media, depth+1)
+    return media
+
+
+def getResidentBytes():
+    """ returns the estimated size of the media we're keeping loaded """
+    return sum([entry[1] for entry in _gResident.values()])
+
+
+def _keep(key, load):
+    # (re)load something and hold on to its media
+    try: media = _collectMedia(load(), [])
+    except Exception:
+        bs.printException('error preloading '+key)
+        return
+    _gResident[key] = [_gRound, sum([gMediaCosts[type(m)] for m in media]),
+                       media]
+
+
+def planPreload(session):
+    """ warms up media for the session's next few games; call as it
+    heads into a score screen """
+    global _gRound
+    _gRound += 1
+    activity = getattr(session, '_nextGameInstance', None)
+    if activity is None:
+        return
+    startTime = time.time()
+    budget = _getSetting('preloadBudgetMB', 96)*1024*1024
+
+    with bs.Context(activity):
+        # everything the next game will need gets loaded regardless..
+        needed = []
+        for moduleName, className in gFactories:
+            module = sys.modules.get(moduleName)
+            if module is not None:
+                needed.append(('factory:'+moduleName+'.'+className,
+                               getattr(module, className).getFactory))
+        import bsSpaz
+        spazFactory = bsSpaz.Spaz.getFactory()
+        for character in set([p.character for p in session.players
+                              if p.character in bsSpaz.appearances]):
+            needed.append(('character:'+character,
+                           bs.Call(_loadCharacter, spazFactory, character)))
+        # (the next game preloaded its own map already; this just keeps it)
+        try:
+            mapType = bsMap.getMapClass(
+                session._nextGameSpec['settings']['map'])
+            needed.append(('map:'+mapType.name, mapType.preload))
+        except Exception:
+            pass
+        for key, load in needed:
+            _keep(key, load)
+
+        # ..whereas maps further ahead only do if there's room
+        try: upcoming = session._playlist.peek(
+                _getSetting('preloadLookahead', 2))
+        except Exception:
+            bs.printException('error peeking at upcoming games')
+            upcoming = []
+        for gamespec in upcoming:
+            try: mapType = bsMap.getMapClass(gamespec['settings']['map'])
+            except Exception: continue
+            key = 'map:'+mapType.name
+            if key in _gResident:
+                _gResident[key][0] = _gRound
+            elif getResidentBytes() < budget:
+                _keep(key, mapType.preload)
+
+    _evict(budget)
+    bsMetrics.observe('preload_seconds', time.time()-startTime)
+
+
+def _loadCharacter(spazFactory, character):
+    spazFactory._preload(character)
+    return spazFactory.spazMedia.get(character)
+
+
+def _evict(budget):
+    oldest = _gRound - _getSetting('preloadKeepRounds', 3)
+    for key, entry in _gResident.items():
+        if entry[0] <= oldest:
+            del _gResident[key]
+    # still over budget; drop whatever was needed longest ago
+    # (biggest first among equals)
+    for key, entry in sorted(_gResident.items(),
+                             key=lambda e: (e[1][0], -e[1][1])):
+        if getResidentBytes() <= budget:
+            break
+        if entry[0] < _gRound:
+            del _gResident[key]
@@ -1,5 +1,7 @@
 import bs
+import bsTick
 import random
+import math
 
 
 def bsGetAPIVersion():
@@ -11,6 +13,11 @@ def bsGetGames():
     return [RaceGame]
 
 
+# players' race distances only get recalculated when they reach a new
+# region/lap or have moved at least this far since last time
+gRaceMoveThreshold = 0.2
+
+
 class RaceRegion(bs.Actor):
     def __init__(self, pt, index):
         bs.Actor.__init__(self)
@@ -87,6 +94,8 @@ class RaceGame(bs.TeamGameActivity):
         self._swipSound = bs.getSound("swip")
         self._lastTeamTime = None
         self._frontRaceRegion = None
+        # players, front-runner first (see _updatePlayerOrder())
+        self._raceOrder = []
 
     def getInstanceDescription(self):
         if isinstance(
@@ -131,6 +140,15 @@ class RaceGame(bs.TeamGameActivity):
         self._regions = []
         for pt in pts:
             self._regions.append(RaceRegion(pt, len(self._regions)))
+        # each region's point along with the next one's and the distance
+        # between them
+        self._regionSegments = []
+        for i, region in enumerate(self._regions):
+            pt1 = tuple(region._pt[:3])
+            pt2 = tuple(self._regions[(i+1) % len(self._regions)]._pt[:3])
+            self._regionSegments.append(
+                (pt1, pt2, math.sqrt(sum([(a-b)*(a-b)
+                                          for a, b in zip(pt1, pt2)]))))
 
     def _flashPlayer(self, player, scale):
         pos = player.actor.node.position
@@ -323,6 +341,10 @@ class RaceGame(bs.TeamGameActivity):
                     teamDist = min(distances)
                 else:
                     teamDist = max(distances)
+            # (only bother the score-board when something changed)
+            if team.gameData.get('_scoreBoardDist') == teamDist:
+                continue
+            team.gameData['_scoreBoardDist'] = teamDist
             self._scoreBoard.setTeamValue(
                 team, teamDist, self.settings['Laps'],
                 flash=(teamDist >= float(self.settings['Laps'])),
@@ -353,10 +375,10 @@ class RaceGame(bs.TeamGameActivity):
                     self.settings['Mine Spawning'],
                     self._updateRaceMine, repeat=True)
 
-        self._scoreBoardTimer = bs.Timer(
-            250, self._updateScoreBoard, repeat=True)
-        self._playerOrderUpdateTimer = bs.Timer(
-            250, self._updatePlayerOrder, repeat=True)
+        self._scoreBoardTimer = bsTick.add(
+            250, self._updateScoreBoard, bsTick.PHASE_COSMETICS)
+        self._playerOrderUpdateTimer = bsTick.add(
+            250, self._updatePlayerOrder)
 
         if self._isSlowMotion:
             tScale = 0.4
@@ -425,37 +447,59 @@ class RaceGame(bs.TeamGameActivity):
 
     def _updatePlayerOrder(self):
 
-        # calc all player distances
+        # update the distances of players who have gotten anywhere
+        regionCount = len(self._regions)
         for player in self.players:
             try:
-                pos = bs.Vector(*player.actor.node.position)
+                pos = player.actor.node.position
             except Exception:
-                pos = None
-            if pos is not None:
-                rIndex = player.gameData['lastRegion']
-                r1 = self._regions[rIndex]
-                r1Pt = bs.Vector(*r1._pt[:3])
-                r2 = self._regions[0] if rIndex == len(
-                    self._regions)-1 else self._regions[rIndex+1]
-                r2Pt = bs.Vector(*r2._pt[:3])
-                r1Dist = (pos-r1Pt).length()
-                r2Dist = (pos-r2Pt).length()
-                amt = 1.0-(r2Dist/(r2Pt-r1Pt).length())
-                amt = player.gameData['lap'] + (
-                    rIndex+amt) * (1.0/len(self._regions))
-                player.gameData['distance'] = amt
-
-        # sort players by distance and update their ranks
-        pList = [[player.gameData['distance'], player]
-                 for player in self.players]
-        pList.sort(reverse=True)
-        for i, p in enumerate(pList):
+                continue
+            rIndex = player.gameData['lastRegion']
+            lap = player.gameData['lap']
+            last = player.gameData.get('_raceProgress')
+            if (last is not None and last[1] == rIndex and last[2] == lap
+                    and (pos[0]-last[0][0])**2 + (pos[1]-last[0][1])**2
+                    + (pos[2]-last[0][2])**2
+                    < gRaceMoveThreshold*gRaceMoveThreshold):
+                continue
+            player.gameData['_raceProgress'] = (pos, rIndex, lap)
+            r1Pt, r2Pt, segLength = self._regionSegments[rIndex]
+            r2Dist = math.sqrt((pos[0]-r2Pt[0])**2 + (pos[1]-r2Pt[1])**2
+                               + (pos[2]-r2Pt[2])**2)
+            amt = 1.0-(r2Dist/segLength)
+            player.gameData['distance'] = lap + (rIndex+amt)*(1.0/regionCount)
+
+        # keep our order in step with who's playing..
+        order = self._raceOrder
+        current = dict((id(p), p) for p in self.players)
+        if (len(order) != len(current)
+                or [p for p in order if id(p) not in current]):
+            order[:] = [p for p in order if id(p) in current]
+            kept = set([id(p) for p in order])
+            order += [p for p in self.players if id(p) not in kept]
+
+        # ..and re-sort it by swapping neighbors (positions rarely change
+        # much between updates)
+        for i in range(1, len(order)):
+            p = order[i]
+            dist = p.gameData['distance']
+            j = i
+            while j > 0 and order[j-1].gameData['distance'] < dist:
+                order[j] = order[j-1]
+                j -= 1
+            order[j] = p
+
+        # update ranks (and the numbers over players' heads) that changed
+        for i, p in enumerate(order):
             try:
-                p[1].gameData['rank'] = i
-                if p[1].actor is not None:
-                    n = p[1].actor.distanceTxt
-                    if n.exists():
-                        n.text = str(i+1) if p[1].isAlive() else ''
+                p.gameData['rank'] = i
+                if p.actor is not None:
+                    n = p.actor.distanceTxt
+                    text = str(i+1) if p.isAlive() else ''
+                    if getattr(p.actor, '_raceRankText', None) != text \
+                            and n.exists():
+                        n.text = text
+                        p.actor._raceRankText = text
             except Exception:
                 bs.printException('error updating player orders')
 
@@ -1,5 +1,6 @@
 import bs
 import bsUtils
+import bsMetrics
 import weakref
 
 class _Entry(object):
@@ -126,6 +127,9 @@ class _Entry(object):
             'color': c+(1.0,)}))
 
         self._score = None
+        # what we last showed (score, maxScore, countdown, showValue)
+        self._shownState = None
+        self._pos = None
 
     def flash(self, countdown, extraFlash):
         self._flashTimer = bs.Timer(
@@ -140,8 +144,8 @@ class _Entry(object):
         self._setFlashColors(True)
 
     def _setPosition(self, p):
-        # abort if we've been killed
-        if not self._backing.node.exists():
+        # abort if we've been killed (or if we're already there)
+        if not self._backing.node.exists() or self._pos == tuple(p):
             return
         self._pos = tuple(p)
         self._backing.node.position = (p[0]+self._width/2, p[1]-self._height/2)
@@ -192,6 +196,12 @@ class _Entry(object):
     def setValue(
             self, score, maxScore=None, countdown=False, flash=True,
             showValue=True):
+        """ returns False if this is what we're already showing (and so
+        nothing needed doing) """
+        state = (score, maxScore, countdown, showValue)
+        if state == self._shownState:
+            return False
+        self._shownState = state
 
         # if we have no score yet, just set it.. otherwise compare and see if we
         # should flash
@@ -231,6 +241,7 @@ class _Entry(object):
             self._scoreText.node.text = str(score)
         else:
             self._scoreText.node.text = ''
+        return True
 
 
 class _EntryProxy(object):
@@ -265,6 +276,10 @@ class ScoreBoard(object):
         self._entries = {}
         self._label = label
         self._scoreSplit = scoreSplit
+        self._layoutPending = False
+        # setTeamValue() calls that changed something vs. ones that didn't
+        self._updatesApplied = 0
+        self._updatesSuppressed = 0
 
         # for free-for-all we go simpler since we have one per player
         if isinstance(bs.getSession(), bs.FreeForAllSession):
@@ -294,9 +309,22 @@ class ScoreBoard(object):
                 raise Exception("existing _EntryProxy found")
             team.gameData['_scoreBoardEntry'] = _EntryProxy(self, team)
         # now set the entry..
-        self._entries[team.getID()].setValue(score=score, maxScore=maxScore,
-                                             countdown=countdown, flash=flash,
-                                             showValue=showValue)
+        if self._entries[team.getID()].setValue(
+                score=score, maxScore=maxScore, countdown=countdown,
+                flash=flash, showValue=showValue):
+            self._updatesApplied += 1
+            bsMetrics.inc('scoreboard_updates_total', (('result', 'applied'),))
+        else:
+            self._updatesSuppressed += 1
+            bsMetrics.inc('scoreboard_updates_total',
+                          (('result', 'suppressed'),))
+
+    def getUpdateCounts(self):
+        """
+        Return (applied, suppressed) counts of setTeamValue() calls; ones
+        that didn't change anything get suppressed.
+        """
+        return self._updatesApplied, self._updatesSuppressed
 
     def _addTeam(self, team):
         if team.getID() in self._entries:
@@ -309,9 +337,13 @@ class ScoreBoard(object):
 
     def _removeTeam(self, teamID):
         del self._entries[teamID]
-        self._updateTeams()
+        # (teams tend to go all at once; just lay things out once after)
+        if not self._layoutPending:
+            self._layoutPending = True
+            bs.pushCall(bs.WeakCall(self._updateTeams))
 
     def _updateTeams(self):
+        self._layoutPending = False
         p = list(self._pos)
         for e in self._entries.values():
             e._setPosition(p)
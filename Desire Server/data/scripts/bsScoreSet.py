@@ -4,8 +4,12 @@ import bsSpaz
 import weakref
 import math
 import random
+import heapq
 import bsInternal
 
+# kills within this many ms of the previous one count toward a multi-kill
+gMultiKillWindow = 1000
+
 class PlayerScoredMessage(object):
     """
     category: Message Classes
@@ -21,11 +25,63 @@ class PlayerScoredMessage(object):
         'Instantiate with the given values'
         self.score = score
 
+class _PopupScheduler(object):
+    """ hands out an activity's delayed multi-kill awards at their due times;
+    runs off a single timer set for the earliest pending one """
+
+    def __init__(self, activity):
+        self._activity = weakref.ref(activity)
+        self._pending = [] # heap of (game time due, seq, args)
+        self._seq = 0
+        self._timer = None
+        self._timerDue = None
+
+    def push(self, dueTime, args):
+        heapq.heappush(self._pending, (dueTime, self._seq, args))
+        self._seq += 1
+        self._setTimer()
+
+    def _setTimer(self):
+        due = self._pending[0][0] if self._pending else None
+        if due == self._timerDue:
+            return
+        self._timerDue = due
+        activity = self._activity()
+        if due is None or activity is None:
+            self._timer = None
+            return
+        with bs.Context(activity):
+            self._timer = bs.Timer(max(0, due-bs.getGameTime()),
+                                   bs.WeakCall(self._run))
+
+    def _run(self):
+        self._timer = None
+        self._timerDue = None
+        now = bs.getGameTime()
+        while self._pending and self._pending[0][0] <= now:
+            args = heapq.heappop(self._pending)[2]
+            try: args[0]._applyMultiKill(*args[1:])
+            except Exception: bs.printException('error applying multi-kill')
+        self._setTimer()
+
+
+def _getPopupScheduler(activity):
+    try: return activity._scoreSetPopups
+    except Exception:
+        s = activity._scoreSetPopups = _PopupScheduler(activity)
+        return s
+
+
 class ScoreSet(object):
     """ Manages individual score keeping for players; provides persistant scores and some other goodies.
     Players are indexed here by name so that if a player leaves and comes back he'll keep the same score """
 
     class _Player(object):
+        __slots__ = ('name', 'nameFull', 'score', 'accumScore', 'killCount',
+                     'accumKillCount', 'killedCount', 'accumKilledCount',
+                     'streak', 'lastPlayer', '_player', 'team', 'character',
+                     '_spaz', '_multiKillCount', '_lastKillTime', '_scoreSet')
+
         def __init__(self, name, nameFull, player, scoreSet):
             self.name = name
             self.nameFull = nameFull
@@ -35,8 +91,8 @@ class ScoreSet(object):
             self.accumKillCount = 0
             self.killedCount = 0
             self.accumKilledCount = 0
-            self._multiKillTimer = None
             self._multiKillCount = 0
+            self._lastKillTime = None
             self._scoreSet = weakref.ref(scoreSet)
             self._associateWithPlayer(player)
 
@@ -57,7 +113,9 @@ class ScoreSet(object):
             return self._spaz()
 
         def cancelMultiKillTimer(self):
-            self._multiKillTimer = None
+            # ends any multi-kill in progress
+            self._multiKillCount = 0
+            self._lastKillTime = None
 
         def getActivity(self):
             try: return self._scoreSet()._activity()
@@ -70,13 +128,15 @@ class ScoreSet(object):
             self.character = player.character
             self._spaz = None
             self.streak = 0
-            
-        def _endMultiKill(self):
-
-            self._multiKillTimer = None
-            self._multiKillCount = 0
 
         def submitKill(self,showPoints=True):
+            # rather than a timer per kill to end the multi-kill, we just see
+            # how long it's been since the last one
+            now = bs.getGameTime()
+            if (self._lastKillTime is None
+                    or now - self._lastKillTime >= gMultiKillWindow):
+                self._multiKillCount = 0
+            self._lastKillTime = now
             self._multiKillCount += 1
 
             if self._multiKillCount == 1:
@@ -118,41 +178,40 @@ class ScoreSet(object):
                 delay = 1000
                 sound = self._scoreSet()._orchestraHitSound4
 
-            def _apply(name,score,showPoints,color,scale,sound):
-
-                # only award this if they're still alive and we can get their pos
-                try: ourPos = self.getSpaz().node.position
-                except Exception: return
-
-                # jitter position a bit since these often come in clusters
-                ourPos = (ourPos[0]+(random.random()-0.5)*2.0,
-                          ourPos[1]+(random.random()-0.5)*2.0,
-                          ourPos[2]+(random.random()-0.5)*2.0)
+            if name is not None:
                 activity = self.getActivity()
                 if activity is not None:
-                    bsUtils.PopupText(
-                        # (('+'+str(score)+' ') if showPoints else '')+name,
-                        bs.Lstr(value=(('+'+str(score)+' ') if showPoints else '')+'${N}',subs=[('${N}',name)]),
-                        color=color,
-                        scale=scale,
-                        position=ourPos).autoRetain()
-                bs.playSound(sound)
+                    _getPopupScheduler(activity).push(
+                        now+300+delay,
+                        (self, name, score, showPoints, color, scale, sound))
 
-                self.score += score
-                self.accumScore += score
+        def _applyMultiKill(self, name, score, showPoints, color, scale, sound):
 
-                # inform a running game of the score
-                if score != 0 and activity is not None:
-                    activity.handleMessage(PlayerScoredMessage(score=score))
+            # only award this if they're still alive and we can get their pos
+            try: ourPos = self.getSpaz().node.position
+            except Exception: return
 
-            if name is not None:
-                bs.gameTimer(300+delay,bs.Call(_apply,name,score,showPoints,color,scale,sound))
+            # jitter position a bit since these often come in clusters
+            ourPos = (ourPos[0]+(random.random()-0.5)*2.0,
+                      ourPos[1]+(random.random()-0.5)*2.0,
+                      ourPos[2]+(random.random()-0.5)*2.0)
+            activity = self.getActivity()
+            if activity is not None:
+                bsUtils.PopupText(
+                    # (('+'+str(score)+' ') if showPoints else '')+name,
+                    bs.Lstr(value=(('+'+str(score)+' ') if showPoints else '')+'${N}',subs=[('${N}',name)]),
+                    color=color,
+                    scale=scale,
+                    position=ourPos).autoRetain()
+            bs.playSound(sound)
 
-            # keep the tally rollin'...
-            # set a timer for a bit in the future
-            self._multiKillTimer = bs.Timer(1000,self._endMultiKill)
+            self.score += score
+            self.accumScore += score
+
+            # inform a running game of the score
+            if score != 0 and activity is not None:
+                activity.handleMessage(PlayerScoredMessage(score=score))
 
-        
     def __init__(self):
         self._activity = None
         self._players = {}
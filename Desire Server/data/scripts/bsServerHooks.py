@@ -0,0 +1,200 @@
+"""
+Engine hooks needed by a hosting (server) game, kept apart from bsUI so a
+headless server doesn't have to load the full UI to filter chat.
+
+In headless mode bs installs lazy stand-ins for the client-only modules
+(bsUI, bsUI2, bsMainMenu, bsServerData). These serve the hooks below
+directly and only import the real module the first time anything else on
+it is touched.
+
+Set BS_IMPORT_REPORT=1 in the environment to have the server print how
+long each module took to import (and how much resident memory it added)
+once it is up and running.
+"""
+
+import os
+import sys
+import time
+import types
+import __builtin__
+import bsInternal
+import bsMetrics
+import bsLog
+import bsTrace
+
+# modules that only matter to clients with a screen
+gLazyModules = ('bsUI', 'bsUI2', 'bsMainMenu', 'bsServerData')
+
+_gImportTimes = {}
+_gImportStack = []
+_gOrigImport = None
+_gStartTime = None
+_gStartRSS = None
+
+
+# Called for *all* chat messages while hosting.
+# Messages originating from the host will have clientID -1.
+# Should filter and return the string to be displayed,
+# or return None to ignore the message.
+def _filterChatMessage(msg, clientID):
+    import settings
+    import hack
+
+    bsMetrics.inc('chat_messages_total')
+    bsLog.log('chat', 'message', msg, clientID=clientID)
+    bsTrace.record(bsTrace.CHAT, clientID, msg)
+    if clientID != -1:
+        if hack.spamProtection:
+            import systemm
+            if systemm.checkSpam(clientID) == False: return None
+    if msg.startswith('/'):
+        import chatCmd
+        chatCmd.cmd(msg, clientID)
+        return None
+    import systemm
+    for word in settings.chatfilter:
+        if word in msg.lower():
+            systemm.k(clientID)
+            systemm.warn(clientID)
+            systemm.check(clientID)
+            msg = "**Restricted Words**"
+    if settings.enableCoinSystem:
+        import coinSystem
+        if msg.lower() == coinSystem.correctAnswer:
+            coinSystem.checkAnswer(msg, clientID)
+            return None
+    return msg
+
+
+# Called for local chat messages when the party window is up.
+def _handleLocalChatMessage(msg):
+    # there can't be a party window if the ui was never loaded
+    ui = sys.modules.get('bsUI')
+    if isinstance(ui, _LazyModule):
+        ui = ui._getLoadedModule()
+    if ui is not None:
+        ui._handleLocalChatMessage(msg)
+
+
+class _LazyModule(types.ModuleType):
+    """ stand-in for a module; serves the given attributes directly and
+    imports the real module on any other access """
+
+    def __init__(self, name, attrs=None):
+        types.ModuleType.__init__(self, name)
+        self.__dict__['_lazyModule'] = None
+        if attrs:
+            self.__dict__.update(attrs)
+
+    def _getLoadedModule(self):
+        return self.__dict__['_lazyModule']
+
+    def _load(self):
+        module = self.__dict__['_lazyModule']
+        if module is None:
+            name = self.__name__
+            if sys.modules.get(name) is self:
+                del sys.modules[name]
+            try:
+                module = __import__(name)
+            except Exception:
+                sys.modules.setdefault(name, self)
+                raise
+            self.__dict__['_lazyModule'] = module
+        return module
+
+    def __getattr__(self, attr):
+        # (only called for attrs not in our own dict)
+        if attr.startswith('__') and attr.endswith('__'):
+            raise AttributeError(attr)
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        # stop serving our copy of anything that gets replaced
+        self.__dict__.pop(attr, None)
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        return ('<lazy module ' + repr(self.__name__)
+                + (' (loaded)>' if self._getLoadedModule() is not None
+                   else '>'))
+
+
+def _installLazyModules():
+    """ swap in lazy stand-ins for client-only modules if we're headless """
+    if bsInternal.getEnvironment()['subplatform'] != 'headless':
+        return
+    hooks = {'bsUI': {'_filterChatMessage': _filterChatMessage,
+                      '_handleLocalChatMessage': _handleLocalChatMessage}}
+    for name in gLazyModules:
+        if name not in sys.modules:
+            sys.modules[name] = _LazyModule(name, hooks.get(name))
+
+
+def _getRSS():
+    """ resident memory of this process in kB (or None if unavailable) """
+    try:
+        f = open('/proc/self/status')
+        try:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+        finally:
+            f.close()
+    except Exception:
+        pass
+    return None
+
+
+def _timedImport(name, *args, **keywds):
+    origImport = _gOrigImport or __builtin__.__import__
+    if name in sys.modules:
+        return origImport(name, *args, **keywds)
+    _gImportStack.append(0.0)
+    t = time.time()
+    rss = _getRSS()
+    try:
+        return origImport(name, *args, **keywds)
+    finally:
+        total = time.time() - t
+        nested = _gImportStack.pop()
+        if _gImportStack:
+            _gImportStack[-1] += total
+        rssAfter = _getRSS()
+        _gImportTimes[name] = (total - nested, total,
+                               rssAfter - rss if None not in (rss, rssAfter)
+                               else None)
+
+
+def _startImportReport():
+    """ start timing module imports (if BS_IMPORT_REPORT is set) """
+    global _gOrigImport
+    global _gStartTime
+    global _gStartRSS
+    if not os.environ.get('BS_IMPORT_REPORT') or _gOrigImport is not None:
+        return
+    _gStartTime = time.time()
+    _gStartRSS = _getRSS()
+    _gOrigImport = __builtin__.__import__
+    __builtin__.__import__ = _timedImport
+
+
+def _finishImportReport():
+    """ stop timing imports and print what we found """
+    global _gOrigImport
+    if _gOrigImport is None:
+        return
+    __builtin__.__import__ = _gOrigImport
+    _gOrigImport = None
+    entries = sorted(_gImportTimes.items(), key=lambda e: -e[1][0])
+    print 'IMPORT REPORT (self ms / total ms / rss kB):'
+    for name, (selfTime, total, rss) in entries:
+        print '  %-28s %8.1f %8.1f %8s' % (name, selfTime*1000.0,
+                                            total*1000.0, rss)
+    rss = _getRSS()
+    print '  startup took %.1f ms; rss %s kB (%s kB at start)' % (
+        (time.time()-_gStartTime)*1000.0, rss, _gStartRSS)
+    lazy = [n for n in gLazyModules
+            if isinstance(sys.modules.get(n), _LazyModule)]
+    if lazy:
+        print '  not loaded:', ', '.join(lazy)
@@ -4,6 +4,7 @@ import bs
 import bsUtils
 import bdUtils
 import bsInternal
+import bsTick
 import hack
 import settings
 # list of defined spazzes
@@ -3177,16 +3178,130 @@ class PirateBotShielded(PirateBot):
     pointsMult = 5
 
     
+class BotTarget(object):
+    """
+    category: Bot Classes
+
+    Something the bots in a bs.BotSet might go after; see the
+    targetFilter arg to bs.BotSet().
+
+    Attributes:
+
+       node
+          The target's spaz node.
+
+       player
+          The bs.Player whose spaz this is, or None for bots.
+
+       botSet
+          The id() of the bs.BotSet a living bot belongs to, or None for
+          players (and bots in no set).
+
+       sourcePlayer
+          The bs.Player a bot is working for, if any.
+
+       pt
+          A (position, velocity) tuple of bs.Vectors.
+    """
+    __slots__ = ['node', 'player', 'botSet', 'sourcePlayer', 'pt']
+
+    def __init__(self, node, player=None, botSet=None, sourcePlayer=None):
+        self.node = node
+        self.player = player
+        self.botSet = botSet
+        self.sourcePlayer = sourcePlayer
+        self.pt = (bs.Vector(*node.position), bs.Vector(*node.velocity))
+
+
+# bot target tables older than this (game ms) get rebuilt
+gBotTargetMaxAge = 50
+
+
+class _BotTargetTable(object):
+    """ the current activity's targets, shared by all its bot-sets """
+
+    def __init__(self, activity):
+        self.time = bs.getGameTime()
+        self.activity = weakref.ref(activity)
+        self.players = []
+        for player in activity.players:
+            try:
+                if player.isAlive():
+                    self.players.append(BotTarget(player.actor.node, player))
+            except Exception:
+                bs.printException('error on bot-set _update')
+        # (the common case of going after every player needs no filtering)
+        self.playerPts = [t.pt for t in self.players]
+        self._bots = None
+
+    def getBots(self):
+        """ every bot spaz in the activity, whether or not it's in a bot-set
+        (corpses too, like the per-set node scans this replaced); only
+        gathered when some set wants them """
+        if self._bots is None:
+            self._bots = []
+            owners = {}
+            for botSet in _getBotSets(self.activity()):
+                for l in botSet._botLists:
+                    for b in l:
+                        if not b._dead:
+                            owners[id(b)] = id(botSet)
+            try:
+                for node in bs.getNodes():
+                    if node.getNodeType() != 'spaz':
+                        continue
+                    bot = node.getDelegate()
+                    if isinstance(bot, SpazBot):
+                        self._bots.append(BotTarget(
+                            node, botSet=owners.get(id(bot)),
+                            sourcePlayer=getattr(bot, 'sourcePlayer', None)))
+            except Exception:
+                bs.printException('error on bot-set _update')
+        return self._bots
+
+
+def _getBotTargetTable():
+    activity = bs.getActivity()
+    try: table = activity._botTargetTable
+    except Exception: table = None
+    if table is None or bs.getGameTime() - table.time >= gBotTargetMaxAge:
+        table = activity._botTargetTable = _BotTargetTable(activity)
+    return table
+
+
+def _getBotSets(activity):
+    try: refs = activity._botSets
+    except Exception: return []
+    botSets = [r() for r in refs]
+    botSets = [b for b in botSets if b is not None]
+    if len(botSets) != len(refs):
+        activity._botSets = [weakref.ref(b) for b in botSets]
+    return botSets
+
+
 class BotSet(object):
     """
     category: Bot Classes
     
     A container/controller for one or more bs.SpazBots.
+
+    Bots go after every living player by default; pass a targetFilter
+    to change that. It gets called with each bs.BotTarget and should
+    return whether the set's bots should go after it. Bots from other
+    sets are only considered when includeBots is True. (use a bs.WeakCall
+    rather than a plain bound method of the set for this)
     """
-    def __init__(self):
+    # (class-level so subclasses that skip our __init__ still work)
+    _targetFilter = None
+    _includeBots = False
+
+    def __init__(self, targetFilter=None, includeBots=False):
         """
         Create a bot-set.
         """
+        self._targetFilter = targetFilter
+        self._includeBots = includeBots
+        self._registerBotSet()
         # we spread our bots out over a few lists so we can update
         # them in a staggered fashion
         self._botListCount = 5
@@ -3255,19 +3370,40 @@ class BotSet(object):
         self._botUpdateList = (self._botUpdateList+1)%self._botListCount
 
         # update our list of player points for the bots to use
-        playerPts = []
-        for player in bs.getActivity().players:
-            try:
-                if player.isAlive():
-                    playerPts.append((bs.Vector(*player.actor.node.position),
-                                     bs.Vector(*player.actor.node.velocity)))
-            except Exception:
-                bs.printException('error on bot-set _update')
+        playerPts = self._getTargetPts()
 
         for b in botList:
             b._setPlayerPts(playerPts)
             b._updateAI()
 
+    def _registerBotSet(self):
+        # (so other sets can find our bots in the activity's target table)
+        activity = bs.getActivity()
+        try: refs = activity._botSets
+        except Exception: refs = activity._botSets = []
+        refs.append(weakref.ref(self))
+
+    def _getTargetPts(self):
+        """
+        Returns (position, velocity) points of what our bots should go after.
+        """
+        table = _getBotTargetTable()
+        if self._targetFilter is None and not self._includeBots:
+            return table.playerPts
+        targets = table.players
+        if self._includeBots:
+            targets = targets + table.getBots()
+        if self._targetFilter is None:
+            return [t.pt for t in targets]
+        pts = []
+        for t in targets:
+            try:
+                if self._targetFilter(t):
+                    pts.append(t.pt)
+            except Exception:
+                bs.printException('error in bot-set target filter')
+        return pts
+
     def clear(self):
         """
         Immediately clear out any bots in the set.
@@ -3295,8 +3431,8 @@ class BotSet(object):
         """
         Starts processing bot AI updates and let them start doing their thing.
         """
-        self._botUpdateTimer = bs.Timer(50, bs.WeakCall(self._update),
-                                        repeat=True)
+        self._botUpdateTimer = bsTick.add(50, bs.WeakCall(self._update),
+                                          bsTick.PHASE_AI)
                     
     def stopMoving(self):
         """
@@ -1,4 +1,5 @@
 import bs
+import bsTick
 import random
 import math
 
@@ -92,7 +93,7 @@ class TargetPracticeGame(bs.TeamGameActivity):
         for i in range(numTargets):
             bs.gameTimer(5000 + i * 1000, self._spawnTarget)
 
-        self._updateTimer = bs.Timer(1000, self._update, repeat=True)
+        self._updateTimer = bsTick.add(1000, self._update)
 
         self._countdown = bs.OnScreenCountdown(60, endCall=self.endGame)
         bs.gameTimer(4000, self._countdown.start)
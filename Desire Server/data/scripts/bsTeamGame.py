@@ -3,9 +3,10 @@ import bsGame
 import bsUtils
 import random
 import weakref
-import copy
+import collections
 import bsTutorial
 import bsInternal
+import bsPreload
 
 gDefaultTeamColors = ((1,0.31,0.31), (1,1,0))
 gDefaultTeamNames = (u'You\ue00c',u'Me\ue00c')
@@ -30,6 +31,7 @@ class TeamGameResults(object):
 
         self._gameSet = False
         self._scores = {}
+        self._winners = None
 
     def _setGame(self, game):
         if self._gameSet:
@@ -37,12 +39,21 @@ class TeamGameResults(object):
         self._gameSet = True
         self._teams = [weakref.ref(team) for team in game.teams]
         scoreInfo = game.getResolvedScoreInfo()
-        self._playerInfo = copy.deepcopy(game.initialPlayerInfo)
+        # (frozen as (name, character) pairs so later changes to the game's
+        # entries can't leak in; the names and characters are immutable
+        # strings, so this still shares them rather than copying)
+        self._playerInfo = tuple((info['name'], info['character'])
+                                 for info in game.initialPlayerInfo)
         self._lowerIsBetter = scoreInfo['lowerIsBetter']
         self._scoreName = scoreInfo['scoreName']
         self._noneIsWinner = scoreInfo['noneIsWinner']
         self._scoreType = scoreInfo['scoreType']
 
+    def _getPlayerInfo(self):
+        'Return the game\'s player info as a list of name/character dicts.'
+        return [{'name': name, 'character': character}
+                for name, character in self._playerInfo]
+
     def setTeamScore(self, team, score):
         """
         Set the score for a given bs.Team.
@@ -50,14 +61,19 @@ class TeamGameResults(object):
         (see the noneIsWinner arg in the constructor)
         """
         self._scores[team.getID()] = (weakref.ref(team), score)
+        self._winners = None
+
+    def _getScoreEntry(self, team):
+        score = self._scores.get(team.getID())
+        if score is not None and score[0]() is team:
+            return score
+        return None
 
     def _getTeamScore(self, team):
         'Return the score for a given bs.Team'
-        for score in self._scores.values():
-            if score[0]() is team:
-                return score[1]
+        score = self._getScoreEntry(team)
         # if we have no score, None is assumed
-        return None
+        return None if score is None else score[1]
 
     def _getTeams(self):
         'Return all bs.Teams in the results.'
@@ -72,10 +88,7 @@ class TeamGameResults(object):
 
     def _hasScoreForTeam(self, team):
         'Return whether there is a score for a given bs.Team'
-        for score in self._scores.values():
-            if score[0]() is team:
-                return True
-        return False
+        return self._getScoreEntry(team) is not None
 
     def _getTeamScoreStr(self, team):
         """
@@ -84,17 +97,15 @@ class TeamGameResults(object):
         """
         if not self._gameSet:
             raise Exception("cant get this until game is set")
-        for score in self._scores.values():
-            if score[0]() is team:
-                if score[1] is None:
-                    return '-'
-                if self._scoreType == 'seconds':
-                    return bsUtils.getTimeString(score[1]*1000, centi=False)
-                elif self._scoreType == 'milliseconds':
-                    return bsUtils.getTimeString(score[1], centi=True)
-                else:
-                    return str(score[1])
-        return '-'
+        score = self._getScoreEntry(team)
+        if score is None or score[1] is None:
+            return '-'
+        if self._scoreType == 'seconds':
+            return bsUtils.getTimeString(score[1]*1000, centi=False)
+        elif self._scoreType == 'milliseconds':
+            return bsUtils.getTimeString(score[1], centi=True)
+        else:
+            return str(score[1])
 
     def _getScoreName(self):
         'Return the name associated with scores (\'points\', etc)'
@@ -122,71 +133,189 @@ class TeamGameResults(object):
         'Return an ordered list of dicts containing score and teams'
         if not self._gameSet:
             raise Exception("cant get winners until game is set")
-        winners = {}
-        # filter out any dead teams
-        scores = [score for score in self._scores.values()
-                  if score[0]() is not None and score[1] is not None]
-        for score in scores:
-            try:
-                s = winners[score[1]]
-            except Exception:
-                s = winners[score[1]] = []
-            s.append(score[0]())
-        results = winners.items()
-        results.sort(reverse=not self._lowerIsBetter)
-
-        # tack a group with all our 'None' scores onto the end
-        noneTeams = [score[0]() for score in self._scores.values()
-                     if score[0]() is not None and score[1] is None]
-        if len(noneTeams) > 0:
-            nones = [(None, noneTeams)]
-            if self._noneIsWinner:
-                results = nones + results
-            else:
-                results = results + nones
-        return [{'score': r[0], 'teams':r[1]} for r in results]
+        # the grouping/ordering is worked out once (as tuples of team refs)
+        # and reused until scores change; dead teams get filtered per call
+        if self._winners is None:
+            winners = {}
+            for score in self._scores.values():
+                if score[1] is not None:
+                    winners.setdefault(score[1], []).append(score[0])
+            results = winners.items()
+            results.sort(reverse=not self._lowerIsBetter)
+
+            # tack a group with all our 'None' scores onto the end
+            noneTeams = [score[0] for score in self._scores.values()
+                         if score[1] is None]
+            if len(noneTeams) > 0:
+                nones = [(None, noneTeams)]
+                if self._noneIsWinner:
+                    results = nones + results
+                else:
+                    results = results + nones
+            self._winners = tuple((r[0], tuple(r[1])) for r in results)
+        winners = []
+        for score, teamRefs in self._winners:
+            teams = [ref() for ref in teamRefs if ref() is not None]
+            if teams:
+                winners.append({'score': score, 'teams': teams})
+        return winners
+
+
+# how many recent games ShuffleList tries not to repeat maps/types from
+gShuffleHistoryWindow = 3
+# how many random picks ShuffleList tries before settling for the best one
+gShuffleTries = 8
+# loads this many times slower than average count as heavy
+gHeavyLoadFactor = 1.5
+
+# how long (real ms) instantiating games took, smoothed; keyed by
+# (type, map) with per-map fallbacks for combos we've not seen
+_gLoadTimes = {}
+_gMapLoadTimes = {}
+_gLoadTimeTotal = 0.0
+_gLoadTimeCount = 0
+
+
+def recordLoadTime(gamespec, ms):
+    """ notes how long instantiating a game took """
+    global _gLoadTimeTotal
+    global _gLoadTimeCount
+    for times, key in ((_gLoadTimes, (gamespec['type'],
+                                      gamespec['settings']['map'])),
+                       (_gMapLoadTimes, gamespec['settings']['map'])):
+        old = times.get(key)
+        times[key] = ms if old is None else old*0.7 + ms*0.3
+    _gLoadTimeTotal += ms
+    _gLoadTimeCount += 1
+
+
+def getLoadTime(gamespec):
+    """ returns roughly how long instantiating a game takes (real ms), or
+    None if we don't know yet """
+    t = _gLoadTimes.get((gamespec['type'], gamespec['settings']['map']))
+    if t is None:
+        t = _gMapLoadTimes.get(gamespec['settings']['map'])
+    return t
+
+
+def _isHeavyLoad(gamespec):
+    t = getLoadTime(gamespec)
+    return (t is not None and _gLoadTimeCount > 1
+            and t > gHeavyLoadFactor*_gLoadTimeTotal/_gLoadTimeCount)
 
 
 class ShuffleList(object):
     """
     shuffles a set of games with some smarts
     to avoid repeats in maps or game types
+
+    Each pass through the list includes every game once, or more/less
+    often for gamespecs with a 'weight' (2 means twice per pass, 0.5 in
+    every other pass on average). Picks try to avoid the maps and game
+    types of the last historyWindow games and putting two games that are
+    slow to load back to back (see recordLoadTime()).
     """
 
-    def __init__(self, items, shuffle=True):
+    def __init__(self, items, shuffle=True, historyWindow=None):
         self.sourceList = items
         self.shuffle = shuffle
         self.shuffleList = []
         self.lastGotten = None
+        if historyWindow is None:
+            historyWindow = gShuffleHistoryWindow
+        # (nothing could ever be picked if the window covered everything)
+        self._history = collections.deque(
+            maxlen=max(0, min(historyWindow, len(items)-1)))
+        # map/type -> how many times it's in our history
+        self._historyCounts = {}
+        # items already drawn (by peek()) but not pulled yet
+        self._upcoming = []
 
     def pullNext(self):
+        if self._upcoming:
+            return self._upcoming.pop(0)
+        return self._draw()
+
+    def peek(self, count):
+        """ returns the next count items pullNext() will give, without
+        pulling them """
+        while len(self._upcoming) < count:
+            self._upcoming.append(self._draw())
+        return self._upcoming[:count]
+
+    def _refill(self):
+        self.shuffleList = []
+        for item in self.sourceList:
+            weight = item.get('weight', 1.0)
+            copies = int(weight)
+            if random.random() < weight - copies:
+                copies += 1
+            self.shuffleList += [item]*copies
+        if not self.shuffleList:
+            self.shuffleList = list(self.sourceList)
+
+    def _getPenalty(self, item):
+        penalty = 0
+        last = self.lastGotten
+        if last is not None:
+            # repeating the last map or type is worst..
+            if item['settings']['map'] == last['settings']['map']:
+                penalty += 4
+            if item['type'] == last['type']:
+                penalty += 4
+            if _isHeavyLoad(last) and _isHeavyLoad(item):
+                penalty += 2
+        # ..then repeating anything recent
+        if self._historyCounts.get(('map', item['settings']['map'])):
+            penalty += 1
+        if self._historyCounts.get(('type', item['type'])):
+            penalty += 1
+        return penalty
+
+    def _draw(self):
 
         # refill our list if its empty
         if len(self.shuffleList) == 0:
-            self.shuffleList = list(self.sourceList)
+            self._refill()
 
         # ok now find an index we should pull
         index = 0
 
-        if self.shuffle:
-            for i in range(4):
-                index = random.randrange(0, len(self.shuffleList))
-                testObj = self.shuffleList[index]
-                # if the new one is the same map or game-type as the previous,
-                # lets try to keep looking..
-                if len(self.shuffleList) > 1 and self.lastGotten is not None:
-                    if testObj['settings']['map'] == \
-                       self.lastGotten['settings']['map']:
-                        continue
-                    if testObj['type'] == self.lastGotten['type']:
-                        continue
+        if self.shuffle and len(self.shuffleList) > 1:
+            bestPenalty = None
+            for i in range(gShuffleTries):
+                testIndex = random.randrange(0, len(self.shuffleList))
+                penalty = self._getPenalty(self.shuffleList[testIndex])
+                if bestPenalty is None or penalty < bestPenalty:
+                    index = testIndex
+                    bestPenalty = penalty
                 # sufficiently different.. lets go with it
-                break
+                if penalty == 0:
+                    break
 
-        obj = self.shuffleList.pop(index)
+        # (when shuffling, order doesn't matter in here, so swap it to the
+        # end to pop it; otherwise we need to keep playlist order)
+        if self.shuffle:
+            self.shuffleList[index], self.shuffleList[-1] = \
+                self.shuffleList[-1], self.shuffleList[index]
+            obj = self.shuffleList.pop()
+        else:
+            obj = self.shuffleList.pop(index)
         self.lastGotten = obj
+        self._remember(obj)
         return obj
 
+    def _remember(self, item):
+        if self._history.maxlen == 0:
+            return
+        if len(self._history) == self._history.maxlen:
+            for key in self._history[0]:
+                self._historyCounts[key] -= 1
+        keys = (('map', item['settings']['map']), ('type', item['type']))
+        self._history.append(keys)
+        for key in keys:
+            self._historyCounts[key] = self._historyCounts.get(key, 0) + 1
+
 
 class TeamsScoreScreenActivity(bsGame.ScoreScreenActivity):
 
@@ -244,20 +373,15 @@ class TeamsScoreScreenActivity(bsGame.ScoreScreenActivity):
         # scores from)
         if results is not None:
             playersSorted = []
-            validPlayers = self.scoreSet.getValidPlayers().items()
-
-            def _getPlayerScoreSetEntry(player):
-                for p in validPlayers:
-                    if p[1].getPlayer() is player:
-                        return p[1]
-                return None
+            validPlayers = dict((id(p.getPlayer()), p) for p in
+                                self.scoreSet.getValidPlayers().values())
 
             # results is already sorted; just convert it into a list of
             # score-set-entries
             for winner in results._getWinners():
                 for team in winner['teams']:
                     if len(team.players) == 1:
-                        playerEntry = _getPlayerScoreSetEntry(team.players[0])
+                        playerEntry = validPlayers.get(id(team.players[0]))
                         if playerEntry is not None:
                             playersSorted.append(playerEntry)
         else:
@@ -299,11 +423,13 @@ class TeamsScoreScreenActivity(bsGame.ScoreScreenActivity):
 
         _txt(390, 0, translated)
 
+        # work out each row's score once up front
+        rows = [(p, _getPlayerScore(p), _getPlayerScoreStr(p))
+                for p in playersSorted]
+
         topKillCount = 0
         topKilledCount = 99999
-        topScore = 0 if(
-            len(playersSorted) == 0) else _getPlayerScore(
-            playersSorted[0])
+        topScore = 0 if len(rows) == 0 else rows[0][1]
 
         for p in playersSorted:
             topKillCount = max(topKillCount, p.accumKillCount)
@@ -319,7 +445,7 @@ class TeamsScoreScreenActivity(bsGame.ScoreScreenActivity):
                 vAlign='center', maxWidth=maxWidth, transition='inLeft',
                 transitionDelay=tDelay + delay).autoRetain()
 
-        for p in playersSorted:
+        for p, score, scoreStr in rows:
             tDelay += 50
             vOffs -= spacing
             bsUtils.Image(
@@ -341,9 +467,7 @@ class TeamsScoreScreenActivity(bsGame.ScoreScreenActivity):
                 180, p.accumKillCount == topKillCount, 100)
             _scoreTxt(str(p.accumKilledCount), 280,
                       p.accumKilledCount == topKilledCount, 100)
-            _scoreTxt(
-                _getPlayerScoreStr(p),
-                390, _getPlayerScore(p) == topScore, 200)
+            _scoreTxt(scoreStr, 390, score == topScore, 200)
 
 
 class FreeForAllVictoryScoreScreenActivity(TeamsScoreScreenActivity):
@@ -364,26 +488,27 @@ class FreeForAllVictoryScoreScreenActivity(TeamsScoreScreenActivity):
         scale = 1.2
         spacing = 37.0
 
+        # gather everything we lay out by once up front:
+        # (player, previous score, score, name)
+        rows = []
+        for player in self.players:
+            sessionData = player.getTeam().sessionData
+            rows.append((player, sessionData['previousScore'],
+                         sessionData['score'], player.getName(full=True)))
+
         # we include name and previous score in the sort to reduce the amount
         # of random jumping around the list we do in cases of ties
-        playerOrderPrev = list(self.players)
-        playerOrderPrev.sort(reverse=True, key=lambda player: (
-            player.getTeam().sessionData['previousScore'],
-            player.getName(full=True)))
-        playerOrder = list(self.players)
-        playerOrder.sort(reverse=True,
-                         key=lambda player: (
-                             player.getTeam().sessionData['score'],
-                             player.getTeam().sessionData['score'],
-                             player.getName(full=True)))
-
-        vOffs = -74.0 + spacing*len(playerOrderPrev)*0.5
+        rowsPrev = sorted(rows, reverse=True, key=lambda r: (r[1], r[3]))
+        rowsNew = sorted(rows, reverse=True, key=lambda r: (r[2], r[3]))
+        newIndexes = dict((id(r[0]), i) for i, r in enumerate(rowsNew))
+
+        vOffs = -74.0 + spacing*len(rowsPrev)*0.5
 
         delay1 = 1300+100
         delay2 = 2900+100
         delay3 = 2900+100
 
-        orderChange = playerOrder != playerOrderPrev
+        orderChange = ([r[0] for r in rowsNew] != [r[0] for r in rowsPrev])
 
         if orderChange:
             delay3 += 1500
@@ -393,7 +518,13 @@ class FreeForAllVictoryScoreScreenActivity(TeamsScoreScreenActivity):
             delay=1, results=self.settings['results'],
             scale=1.2, xOffset=-110)
 
-        soundTimes = set()
+        # rather than timers for each node, the slides and score count-ups
+        # are collected here and each run off a single timer:
+        # (positionCombine, start, end) for vertical/horizontal slides and
+        # time -> [(node, attr, value)] for count-ups
+        slides = []
+        slidesOut = []
+        updates = {}
 
         def _scoreTxt(
                 text, xOffs, yOffs, highlight, delay, extraScale, flash=False):
@@ -426,20 +557,11 @@ class FreeForAllVictoryScoreScreenActivity(TeamsScoreScreenActivity):
         vOffs -= 25
         vOffsStart = vOffs
 
-        bs.gameTimer(tDelay+delay3, bs.WeakCall(
-            self._safeAnimate,
-            title.positionCombine,
-            'input0', {0: tsHOffs-0.0*scale,
-                       transitionTime2: tsHOffs-(0.0+slideAmt)*scale}))
+        slidesOut.append((title.positionCombine, tsHOffs-0.0*scale,
+                          tsHOffs-(0.0+slideAmt)*scale))
 
-        for i, player in enumerate(playerOrderPrev):
-            vOffs2 = vOffsStart - spacing * (playerOrder.index(player))
-
-            bs.gameTimer(tDelay+300, bs.Call(bs.playSound,
-                                             self._scoreDisplaySoundSmall))
-            if orderChange:
-                bs.gameTimer(tDelay+delay2+100,
-                             bs.Call(bs.playSound, self._cymbalSound))
+        for i, (player, prevScore, score, name) in enumerate(rowsPrev):
+            vOffs2 = vOffsStart - spacing * newIndexes[id(player)]
 
             img = bsUtils.Image(
                 player.getIcon(),
@@ -447,34 +569,22 @@ class FreeForAllVictoryScoreScreenActivity(TeamsScoreScreenActivity):
                           yBase + (vOffs + 15.0) * scale),
                 scale=(30.0 * scale, 30.0 * scale),
                 transition='inLeft', transitionDelay=tDelay).autoRetain()
-            bs.gameTimer(
-                tDelay + delay2, bs.WeakCall(
-                    self._safeAnimate, img.positionCombine, 'input1',
-                    {0: yBase + (vOffs + 15.0) * scale, transitionTime: yBase +
-                     (vOffs2 + 15.0) * scale}))
-            bs.gameTimer(
-                tDelay + delay3, bs.WeakCall(
-                    self._safeAnimate, img.positionCombine, 'input0',
-                    {0: tsHOffs - 72.0 * scale, transitionTime2: tsHOffs -
-                     (72.0 + slideAmt) * scale}))
+            slides.append((img.positionCombine, yBase + (vOffs + 15.0) * scale,
+                           yBase + (vOffs2 + 15.0) * scale))
+            slidesOut.append((img.positionCombine, tsHOffs - 72.0 * scale,
+                              tsHOffs - (72.0 + slideAmt) * scale))
             txt = bsUtils.Text(
-                bs.Lstr(value=player.getName(full=True)),
+                bs.Lstr(value=name),
                 maxWidth=130.0, scale=0.75 * scale,
                 position=(tsHOffs - 50.0 * scale,
                           yBase + (vOffs + 15.0) * scale),
                 hAlign='left', vAlign='center', color=bs.getSafeColor(
                     player.getTeam().color + (1,)),
                 transition='inLeft', transitionDelay=tDelay).autoRetain()
-            bs.gameTimer(
-                tDelay + delay2, bs.WeakCall(
-                    self._safeAnimate, txt.positionCombine, 'input1',
-                    {0: yBase + (vOffs + 15.0) * scale, transitionTime: yBase +
-                     (vOffs2 + 15.0) * scale}))
-            bs.gameTimer(
-                tDelay + delay3, bs.WeakCall(
-                    self._safeAnimate, txt.positionCombine, 'input0',
-                    {0: tsHOffs - 50.0 * scale, transitionTime2: tsHOffs -
-                     (50.0 + slideAmt) * scale}))
+            slides.append((txt.positionCombine, yBase + (vOffs + 15.0) * scale,
+                           yBase + (vOffs2 + 15.0) * scale))
+            slidesOut.append((txt.positionCombine, tsHOffs - 50.0 * scale,
+                              tsHOffs - (50.0 + slideAmt) * scale))
 
             txtNum = bsUtils.Text(
                 '#' + str(i + 1),
@@ -483,64 +593,63 @@ class FreeForAllVictoryScoreScreenActivity(TeamsScoreScreenActivity):
                           yBase + (vOffs + 8.0) * scale),
                 hAlign='right', color=(0.6, 0.6, 0.6, 0.6),
                 transition='inLeft', transitionDelay=tDelay).autoRetain()
-            bs.gameTimer(
-                tDelay + delay3, bs.WeakCall(
-                    self._safeAnimate, txtNum.positionCombine, 'input0',
-                    {0: tsHOffs - 95.0 * scale, transitionTime2: tsHOffs -
-                     (95.0 + slideAmt) * scale}))
-
-            sTxt = _scoreTxt(
-                str(player.getTeam().sessionData['previousScore']),
-                80, 0, False, 0, 1.0)
-            bs.gameTimer(
-                tDelay + delay2, bs.WeakCall(
-                    self._safeAnimate, sTxt.positionCombine, 'input1',
-                    {0: yBase + (vOffs + 2.0) * scale, transitionTime: yBase +
-                     (vOffs2 + 2.0) * scale}))
-            bs.gameTimer(tDelay+delay3, bs.WeakCall(
-                self._safeAnimate, sTxt.positionCombine,
-                'input0', {0: tsHOffs+80*scale,
-                           transitionTime2: tsHOffs+(80-slideAmt)*scale}))
-
-            scoreChange = player.getTeam().sessionData['score'] \
-                - player.getTeam().sessionData['previousScore']
+            slidesOut.append((txtNum.positionCombine, tsHOffs - 95.0 * scale,
+                              tsHOffs - (95.0 + slideAmt) * scale))
+
+            sTxt = _scoreTxt(str(prevScore), 80, 0, False, 0, 1.0)
+            slides.append((sTxt.positionCombine, yBase + (vOffs + 2.0) * scale,
+                           yBase + (vOffs2 + 2.0) * scale))
+            slidesOut.append((sTxt.positionCombine, tsHOffs+80*scale,
+                              tsHOffs+(80-slideAmt)*scale))
+
+            scoreChange = score - prevScore
             if scoreChange > 0:
                 x = 113
                 y = 3.0
                 sTxt2 = _scoreTxt(
                     '+' + str(scoreChange),
                     x, y, True, 0, 0.7, flash=True)
-                bs.gameTimer(tDelay + delay2, bs.WeakCall(
-                    self._safeAnimate, sTxt2.positionCombine,
-                    'input1',
-                    {0: yBase + (vOffs + y + 2.0) * scale,
-                     transitionTime: yBase + (vOffs2 + y + 2.0) *
-                     scale}))
-                bs.gameTimer(
-                    tDelay + delay3, bs.WeakCall(
-                        self._safeAnimate, sTxt2.positionCombine, 'input0',
-                        {0: tsHOffs + x * scale, transitionTime2: tsHOffs +
-                         (x - slideAmt) * scale}))
-
-                def _safeSetAttr(node, attr, value):
-                    if node.exists():
-                        setattr(node, attr, value)
-
-                bs.gameTimer(tDelay+delay1, bs.Call(
-                    _safeSetAttr, sTxt.node, 'color', (1, 1, 1, 1)))
+                slides.append((sTxt2.positionCombine,
+                               yBase + (vOffs + y + 2.0) * scale,
+                               yBase + (vOffs2 + y + 2.0) * scale))
+                slidesOut.append((sTxt2.positionCombine, tsHOffs + x * scale,
+                                  tsHOffs + (x - slideAmt) * scale))
+
+                updates.setdefault(tDelay+delay1, []).append(
+                    (sTxt.node, 'color', (1, 1, 1, 1)))
                 for j in range(scoreChange):
-                    bs.gameTimer(tDelay+delay1+150*j, bs.Call(
-                        _safeSetAttr, sTxt.node, 'text',
-                        str(player.getTeam().sessionData['previousScore']+j+1)))
-                    t = tDelay+delay1+150*j
-                    if not t in soundTimes:
-                        soundTimes.add(t)
-                        bs.gameTimer(
-                            t, bs.Call(
-                                bs.playSound, self._scoreDisplaySoundSmall))
+                    updates.setdefault(tDelay+delay1+150*j, []).append(
+                        (sTxt.node, 'text', str(prevScore+j+1)))
 
             vOffs -= spacing
 
+        # (each row plays these, so they stack up with more players)
+        bs.gameTimer(tDelay+300, bs.WeakCall(
+            self._playSound, self._scoreDisplaySoundSmall, len(rows)))
+        if orderChange:
+            bs.gameTimer(tDelay+delay2+100, bs.WeakCall(
+                self._playSound, self._cymbalSound, len(rows)))
+        bs.gameTimer(tDelay+delay2, bs.WeakCall(
+            self._slideAll, 'input1', transitionTime, slides))
+        bs.gameTimer(tDelay+delay3, bs.WeakCall(
+            self._slideAll, 'input0', transitionTime2, slidesOut))
+        for t, nodeUpdates in updates.items():
+            bs.gameTimer(t, bs.WeakCall(self._applyUpdates, nodeUpdates))
+
+    def _playSound(self, sound, count=1):
+        for i in range(count):
+            bs.playSound(sound)
+
+    def _slideAll(self, attr, duration, slides):
+        for combine, start, end in slides:
+            self._safeAnimate(combine, attr, {0: start, duration: end})
+
+    def _applyUpdates(self, nodeUpdates):
+        for node, attr, value in nodeUpdates:
+            if node.exists():
+                setattr(node, attr, value)
+        bs.playSound(self._scoreDisplaySoundSmall)
+
     def _safeAnimate(self, node, attr, keys):
         if node.exists():
             bsUtils.animate(node, attr, keys)
@@ -1186,9 +1295,9 @@ class TeamBaseSession(bs.Session):
 
         if (self._playlistName != '__default__'
                 and self._playlistName in playlists):
-            # (make sure to copy this, as we muck with it in place once we've
-            # got it and we dont want that to affect our config)
-            playlist = copy.deepcopy(playlists[self._playlistName])
+            # (_filterPlaylist() hands us copies, so this won't touch our
+            # config)
+            playlist = playlists[self._playlistName]
         else:
             if self._useTeams:
                 playlist = bsUtils._getDefaultTeamsPlaylist()
@@ -1246,9 +1355,13 @@ class TeamBaseSession(bs.Session):
                 return 8
 
     def _instantiateNextGame(self):
+        # note how long loading the game took, so the playlist can keep
+        # slow ones apart
+        startTime = bs.getRealTime()
         self._nextGameInstance = bs.newActivity(
             self._nextGameSpec['resolvedType'],
             self._nextGameSpec['settings'])
+        recordLoadTime(self._nextGameSpec, bs.getRealTime()-startTime)
 
     def onPlayerRequest(self, player):
         return bs.Session.onPlayerRequest(self, player)
@@ -1368,6 +1481,10 @@ class TeamBaseSession(bs.Session):
                                 FreeForAllVictoryScoreScreenActivity,
                                 {'results': results}))
 
+            # warm up media for the next few games while scores show
+            try: bsPreload.planPreload(self)
+            except Exception: bs.printException('error preloading media')
+
     def announceGameResults(self, activity, results, delay,
                             announceWinningTeam=True):
         """
@@ -0,0 +1,184 @@
+"""
+Per-activity scheduler for periodic game-mode updates.
+
+Rather than each game mode (and bot-set...) running its own repeating
+timers, they register ticks here; an activity's scheduler runs off a
+single timer, set for whenever the next tick comes due, and runs whatever
+is due then in one pass, phase by phase (score updates, then AI, then
+cosmetics). Tick intervals are rounded up to whole gTickBucket ms and due
+times fall on that grid, so ticks with related intervals share passes and
+a scheduler with only 1000ms ticks wakes once a second.
+
+When the server falls behind (passes start taking more than
+gLoadThreshold real ms on average), phases with a rate limit above 1 in
+gPhaseRateLimits only run every Nth time their ticks come due; setRateLimit()
+changes these per activity. getTimings() returns per-phase timing, which
+also goes to the metrics as tick_phase_seconds.
+"""
+
+import time
+import weakref
+import bs
+import bsMetrics
+
+PHASE_SCORE = 'score'
+PHASE_AI = 'ai'
+PHASE_COSMETICS = 'cosmetics'
+gPhases = (PHASE_SCORE, PHASE_AI, PHASE_COSMETICS)
+
+# tick intervals and due times get rounded up to a multiple of this
+# (game ms)
+gTickBucket = 50
+
+# average pass time (real ms) over which we're considered under load
+gLoadThreshold = 4.0
+
+# under load, ticks in these phases only run every Nth time they're due
+gPhaseRateLimits = {PHASE_SCORE: 1, PHASE_AI: 2, PHASE_COSMETICS: 4}
+
+
+class Tick(object):
+    """ a registered tick; it stops once this object is no longer
+    referenced (like a bs.Timer) or cancel() is called """
+
+    def __init__(self, call, interval, phase, due):
+        self.call = call
+        self.interval = interval
+        self.phase = phase
+        self.due = due
+        self.dueCount = 0
+
+    def cancel(self):
+        self.call = None
+
+
+def _alignUp(t):
+    return -(-int(t)//gTickBucket)*gTickBucket
+
+
+class _Scheduler(object):
+
+    def __init__(self, activity):
+        self._activity = weakref.ref(activity)
+        self.ticks = dict((phase, []) for phase in gPhases)
+        self.rateLimits = dict(gPhaseRateLimits)
+        self.passTime = 0.0
+        # phase -> [calls, total real ms, max real ms, skipped]
+        self.timings = dict((phase, [0, 0.0, 0.0, 0]) for phase in gPhases)
+        # (game time our timer goes off at, if it's set)
+        self.timer = None
+        self.timerDue = None
+
+    def isLoaded(self):
+        return self.passTime > gLoadThreshold
+
+    def _setTimer(self, due):
+        """ (re)sets our timer to go off at game time due (or not at all if
+        None) """
+        if due == self.timerDue:
+            return
+        self.timerDue = due
+        activity = self._activity()
+        if due is None or activity is None:
+            self.timer = None
+            return
+        with bs.Context(activity):
+            self.timer = bs.Timer(max(0, due-bs.getGameTime()),
+                                  bs.WeakCall(self._run))
+
+    def _add(self, tick):
+        self.ticks[tick.phase].append(weakref.ref(tick))
+        if self.timerDue is None or tick.due < self.timerDue:
+            self._setTimer(tick.due)
+
+    def _run(self):
+        self.timer = None
+        self.timerDue = None
+        now = bs.getGameTime()
+        nextDue = None
+        loaded = self.isLoaded()
+        passStart = time.time()
+        for phase in gPhases:
+            ticks = self.ticks[phase]
+            if not ticks:
+                continue
+            rateLimit = self.rateLimits[phase] if loaded else 1
+            timing = self.timings[phase]
+            phaseStart = time.time()
+            ran = False
+            for ref in list(ticks):
+                tick = ref()
+                if tick is None or tick.call is None:
+                    ticks.remove(ref)
+                    continue
+                if tick.due > now:
+                    if nextDue is None or tick.due < nextDue:
+                        nextDue = tick.due
+                    continue
+                tick.due += tick.interval
+                # (if we fell behind, pick up from now instead of
+                # running it repeatedly to catch up)
+                if tick.due <= now:
+                    tick.due = _alignUp(now+tick.interval)
+                if nextDue is None or tick.due < nextDue:
+                    nextDue = tick.due
+                tick.dueCount += 1
+                if tick.dueCount % rateLimit:
+                    timing[3] += 1
+                    continue
+                ran = True
+                try:
+                    tick.call()
+                except Exception:
+                    bs.printException('error in '+phase+' tick '
+                                      +str(tick.call))
+            if ran:
+                elapsed = (time.time()-phaseStart)*1000.0
+                timing[0] += 1
+                timing[1] += elapsed
+                if elapsed > timing[2]:
+                    timing[2] = elapsed
+                bsMetrics.observe('tick_phase_seconds', elapsed*0.001,
+                                  (('phase', phase),))
+        self.passTime = (self.passTime*0.9
+                         + (time.time()-passStart)*1000.0*0.1)
+        # (ticks added during the pass may have set the timer already)
+        if nextDue is not None and (self.timerDue is None
+                                    or nextDue < self.timerDue):
+            self._setTimer(nextDue)
+
+
+def _getScheduler(activity=None):
+    if activity is None:
+        activity = bs.getActivity()
+    try: return activity._tickScheduler
+    except Exception:
+        s = activity._tickScheduler = _Scheduler(activity)
+        return s
+
+
+def add(interval, call, phase=PHASE_SCORE):
+    """ runs call every interval ms of game time in the current activity,
+    as part of the given phase; returns a Tick, which must be kept
+    around for as long as it should keep running """
+    if phase not in gPhases:
+        raise Exception('invalid tick phase: '+str(phase))
+    s = _getScheduler()
+    interval = max(gTickBucket, _alignUp(interval))
+    tick = Tick(call, interval, phase,
+                _alignUp(bs.getGameTime()+interval))
+    s._add(tick)
+    return tick
+
+
+def setRateLimit(phase, rateLimit, activity=None):
+    """ under load, have the phase's ticks run only every rateLimit'th
+    time they're due in the (current) activity """
+    _getScheduler(activity).rateLimits[phase] = max(1, int(rateLimit))
+
+
+def getTimings(activity=None):
+    """ returns {phase: (calls, total ms, max ms, skipped)} for the
+    (current) activity's passes so far, with times in real ms """
+    return dict((phase, tuple(t)) for phase, t
+                in _getScheduler(activity).timings.items())
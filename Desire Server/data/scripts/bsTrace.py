@@ -0,0 +1,200 @@
+"""
+Compact binary traces of server events, for reproducing load offline.
+
+While enabled (the server config's 'traceEvents'), joins and leaves, chat
+messages, chat commands, powerup spawns, explosions and end-of-round
+scores get recorded with timestamps. record() just packs the event and
+appends it to a bounded queue; a background thread writes them out to
+rotating files (trace.bst, trace.bst.1, ...) in a 'traces' dir beside the
+server config. If the writer ever falls behind, the oldest events are
+dropped and a DROPPED event records how many.
+
+The bombsquad_replay script feeds a trace back through the chat, command
+and stats code (see readTrace()).
+
+File format: a header of '<7sBd' (magic, version, trace start time)
+followed by records; each is a '<BIiBH' header (event, ms since the trace
+started, clientID, number of values, text length) followed by that many
+'<f' values and the text in utf-8.
+"""
+
+import os
+import time
+import struct
+import threading
+import collections
+
+# event types
+DROPPED = 0
+JOIN = 1
+LEAVE = 2
+CHAT = 3
+COMMAND = 4
+POWERUP = 5
+EXPLOSION = 6
+SCORES = 7
+gEventNames = {DROPPED:'dropped', JOIN:'join', LEAVE:'leave', CHAT:'chat',
+               COMMAND:'command', POWERUP:'powerup', EXPLOSION:'explosion',
+               SCORES:'scores'}
+
+_MAGIC = 'BSTRACE'
+_VERSION = 1
+_FILE_HEADER = struct.Struct('<7sBd')
+_RECORD_HEADER = struct.Struct('<BIiBH')
+
+gEnabled = False
+
+gMaxFileBytes = 16*1024*1024
+gBackupCount = 4
+# how often the writer thread checks for new events (seconds)
+gFlushInterval = 0.5
+
+# (appends and pops on a deque are atomic, so nobody needs to lock)
+_gQueue = collections.deque(maxlen=50000)
+_gDropped = 0
+_gDir = None
+_gStartTime = None
+_gThread = None
+
+
+def setEnabled(enabled, traceDir=None):
+    """ turn tracing on (writing to traceDir) or off """
+    global gEnabled
+    global _gDir
+    global _gStartTime
+    global _gThread
+    enabled = bool(enabled)
+    if enabled == gEnabled and traceDir == _gDir:
+        return
+    gEnabled = enabled
+    if enabled:
+        _gDir = traceDir
+        _gStartTime = time.time()
+        if _gThread is None:
+            _gThread = threading.Thread(target=_writeEvents)
+            _gThread.daemon = True
+            _gThread.start()
+
+
+def record(event, clientID=-1, text=u'', values=()):
+    """ record an event (if tracing is enabled) """
+    global _gDropped
+    if not gEnabled:
+        return
+    if isinstance(text, unicode):
+        text = text.encode('utf-8')
+    # (the length field is only 16 bits)
+    text = text[:0xffff]
+    ms = int((time.time()-_gStartTime)*1000.0)
+    if len(_gQueue) == _gQueue.maxlen:
+        _gDropped += 1
+    _gQueue.append(_RECORD_HEADER.pack(event, ms, clientID, len(values),
+                                       len(text))
+                   + struct.pack('<%df' % len(values), *values) + text)
+
+
+def _writeEvents():
+    global _gDropped
+    f = None
+    fileDir = None
+    fileStartTime = None
+    while True:
+        if not _gQueue and not _gDropped:
+            time.sleep(gFlushInterval)
+            continue
+        # start a new file whenever tracing gets (re)started
+        if f is not None and (fileDir != _gDir
+                              or fileStartTime != _gStartTime):
+            f.close()
+            f = None
+        try:
+            if f is None:
+                fileDir = _gDir
+                fileStartTime = _gStartTime
+                f = _openTraceFile(fileDir, fileStartTime)
+            if _gDropped:
+                dropped = _gDropped
+                _gDropped = 0
+                text = str(dropped)
+                ms = int((time.time()-fileStartTime)*1000.0)
+                f.write(_RECORD_HEADER.pack(DROPPED, ms, -1, 0, len(text))
+                        + text)
+            while _gQueue:
+                f.write(_gQueue.popleft())
+            f.flush()
+            if f.tell() >= gMaxFileBytes:
+                f.close()
+                f = None
+                _rotate(fileDir)
+        except Exception:
+            # (don't spin on a bad dir; drop what we have and retry later)
+            _gQueue.clear()
+            f = None
+            time.sleep(gFlushInterval)
+
+
+def _getTracePath(traceDir):
+    return os.path.join(traceDir, 'trace.bst')
+
+
+def _openTraceFile(traceDir, startTime):
+    if not os.path.exists(traceDir):
+        os.makedirs(traceDir)
+    f = open(_getTracePath(traceDir), 'ab')
+    if f.tell() == 0:
+        f.write(_FILE_HEADER.pack(_MAGIC, _VERSION, startTime))
+    else:
+        # don't tack a new trace onto an old one
+        f.close()
+        _rotate(traceDir)
+        f = open(_getTracePath(traceDir), 'wb')
+        f.write(_FILE_HEADER.pack(_MAGIC, _VERSION, startTime))
+    return f
+
+
+def _rotate(traceDir):
+    path = _getTracePath(traceDir)
+    for i in range(gBackupCount-1, 0, -1):
+        if os.path.exists(path+'.'+str(i)):
+            if os.path.exists(path+'.'+str(i+1)):
+                os.remove(path+'.'+str(i+1))
+            os.rename(path+'.'+str(i), path+'.'+str(i+1))
+    if os.path.exists(path+'.1'):
+        os.remove(path+'.1')
+    os.rename(path, path+'.1')
+
+
+def getTraceFiles(traceDir):
+    """ returns the trace files in a dir, oldest first """
+    path = _getTracePath(traceDir)
+    paths = [path+'.'+str(i) for i in range(gBackupCount, 0, -1)] + [path]
+    return [p for p in paths if os.path.exists(p)]
+
+
+def readTrace(path):
+    """ generates (event, time, clientID, values, text) tuples for each event
+    in a trace file; time being seconds since the epoch and text unicode """
+    f = open(path, 'rb')
+    try:
+        header = f.read(_FILE_HEADER.size)
+        if len(header) < _FILE_HEADER.size:
+            return
+        magic, version, startTime = _FILE_HEADER.unpack(header)
+        if magic != _MAGIC or version != _VERSION:
+            raise Exception('not a (version '+str(_VERSION)+') trace file: '
+                            +path)
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+            event, ms, clientID, valueCount, textLen = \
+                _RECORD_HEADER.unpack(header)
+            data = f.read(4*valueCount+textLen)
+            # (a trace still being written can end mid-record)
+            if len(data) < 4*valueCount+textLen:
+                return
+            values = struct.unpack('<%df' % valueCount, data[:4*valueCount])
+            text = data[4*valueCount:].decode('utf-8', 'replace')
+            yield event, startTime+ms*0.001, clientID, values, text
+    finally:
+        f.close()
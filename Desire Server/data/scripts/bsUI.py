@@ -23820,36 +23820,9 @@ class StoreWindow(Window):
             self._onCloseCall()
 
 
-# Called for *all* chat messages while hosting.
-# Messages originating from the host will have clientID -1.
-# Should filter and return the string to be displayed,
-# or return None to ignore the message.
-def _filterChatMessage(msg, clientID):
-    import settings
-    import hack
-
-    if clientID != -1:
-      if hack.spamProtection:
-	import systemm
-	if systemm.checkSpam(clientID) == False: return None
-    if msg.startswith('/'):
-	import chatCmd
-	chatCmd.cmd(msg,clientID)
-	return None
-    import systemm
-    for word in settings.chatfilter:
-        if word in msg.lower():
-            systemm.k(clientID)
-            systemm.warn(clientID)
-            systemm.check(clientID)
-            msg = "**Restricted Words**"
-    if settings.enableCoinSystem:
-	import coinSystem
-	if msg.lower() == coinSystem.correctAnswer:
-		coinSystem.checkAnswer(msg,clientID)
-		return None
-    return msg
-    
+# (chat filtering lives in bsServerHooks so headless servers
+# don't need to load this module to get at it)
+from bsServerHooks import _filterChatMessage
 
 
 # Called for local chat messages when the party window is up.
@@ -12,9 +12,16 @@ import ast
 import gc
 import types
 import copy
+import collections
 import bsInternal
 import bsGame
+import bsMetrics
+import bsLog
+import bsClients
+import bsTrace
 import json
+import marshal
+from bsServerHooks import _getRSS
 
 # even when kiosk mode is set, we want behavior to differ depending on
 # whether we launch games from the kiosk menu or the real one
@@ -41,6 +48,12 @@ gNodeOwnerWeakRefs = []
 gNodeOwnerWeakRefsCleanCounter = 0
 gPrintOnceErrors = set()
 
+# recently evaluated Lstrs keyed by (json, language); this is a bounded LRU
+# (oldest entries at the front) and gets cleared whenever the language changes
+_gLstrCache = collections.OrderedDict()
+_gLstrCacheStats = {'hits': 0, 'misses': 0}
+gLstrCacheSize = 256
+
 class Lstr(object):
     """
     category: General Utility Classes
@@ -86,6 +99,7 @@ class Lstr(object):
         the resource nor the fallback resource is found ('resource' mode only).
         """
         if args: raise Exception('Lstr accepts only keyword arguments')
+        self._json = None
         # Basically just store the exact args they passed.
         # ...however if they passed any Lstr values for subs,
         # replace them with that Lstr's dict
@@ -136,7 +150,17 @@ class Lstr(object):
         You should avoid doing this as much as possible and instead pass
         and store Lstr values.
         """
-        return bsInternal._evaluateLstr(self._getJson())
+        key = (self._getJson(), _gLanguage)
+        try:
+            val = _gLstrCache.pop(key)
+            _gLstrCacheStats['hits'] += 1
+        except KeyError:
+            val = bsInternal._evaluateLstr(key[0])
+            _gLstrCacheStats['misses'] += 1
+            if len(_gLstrCache) >= gLstrCacheSize:
+                _gLstrCache.popitem(last=False)
+        _gLstrCache[key] = val
+        return val
 
     def isFlatValue(self):
         """
@@ -148,8 +172,11 @@ class Lstr(object):
                         and not self._args.get('s', [])) else False
 
     def _getJson(self):
+        if self._json is not None:
+            return self._json
         try:
-            return uni(json.dumps(self._args, separators=(',', ':')))
+            self._json = uni(json.dumps(self._args, separators=(',', ':')))
+            return self._json
         except Exception:
             bs.printException('_getJson failed for', self._args)
             return u'JSON_ERR'
@@ -161,6 +188,22 @@ class Lstr(object):
         return '<bs.Lstr: '+self._getJson()+'>'
 
 
+def getLstrCacheStats():
+    """
+    category: General Utility Functions
+
+    Returns a dict of hit/miss counts, hit-rate and size for the cache
+    used by bs.Lstr.evaluate().
+    """
+    hits = _gLstrCacheStats['hits']
+    misses = _gLstrCacheStats['misses']
+    return {'hits': hits,
+            'misses': misses,
+            'hitRate': float(hits)/(hits+misses) if hits+misses else 0.0,
+            'size': len(_gLstrCache),
+            'maxSize': gLstrCacheSize}
+
+
 def printException(*args, **keywds):
     """
     category: General Utility Functions
@@ -558,8 +601,14 @@ class WeakMethod :
     def __str__(self):
         return '<bs.WeakMethod object; call='+str(self.f)+'>'
 
-_gLanguageTarget = None
-_gLanguageMerged = None
+# current language; its compiled tables get loaded lazily from a cache
+# in the config dir (see _loadLanguageData())
+_gLanguage = None
+_gLanguageFlat = None
+_gLanguageTargetKeys = None
+_gLanguageTree = None
+_gLanguageStats = {}
+_gLanguageCacheVersion = 1
 
 def _getLanguages():
     langs = set()
@@ -1213,6 +1262,150 @@ def _prettifyDict(d, indent=0, multiLine=True, returnBits=False):
 gAllowingPackageMods = None
 gPackageModsAdded = set()
 
+# what we know about the scripts in our script dirs, so we don't have to
+# list/import them all every time someone wants game types; entries are
+# keyed by dir and file path and are stored in the config dir between runs.
+# (see _getScriptInfo())
+_gModuleManifest = None
+_gModuleManifestDirty = False
+_gModuleManifestVersion = 2
+# bumped whenever a script dir's listing or a script's contents change
+# (resolved playlists get redone when it does; see _filterPlaylist())
+_gModuleGeneration = 0
+
+# discovery calls we look for when scanning scripts
+gModuleDiscoveryCalls = ('bsGetGames', 'bsGetLevels', 'bsGetAPIVersion')
+
+def _getModuleManifestPath():
+    return os.path.join(
+        os.path.dirname(bs.getEnvironment()['configFilePath']),
+        'moduleManifest.json')
+
+def _loadModuleManifest():
+    global _gModuleManifest
+    manifest = None
+    try:
+        path = _getModuleManifestPath()
+        if os.path.exists(path):
+            f = open(path)
+            manifest = json.loads(f.read())
+            f.close()
+    except Exception:
+        bs.printException('error reading module manifest')
+    if (type(manifest) is not dict
+            or manifest.get('version') != _gModuleManifestVersion):
+        manifest = {'version': _gModuleManifestVersion,
+                    'dirs': {}, 'files': {}}
+    _gModuleManifest = manifest
+
+def _saveModuleManifest():
+    global _gModuleManifestDirty
+    if not _gModuleManifestDirty:
+        return
+    _gModuleManifestDirty = False
+    try:
+        path = _getModuleManifestPath()
+        f = open(path+'.tmp', 'w')
+        f.write(json.dumps(_gModuleManifest))
+        f.close()
+        os.rename(path+'.tmp', path)
+    except Exception:
+        bs.printException('error writing module manifest')
+
+def _listScriptDir(d):
+    """ return names in a script dir; only actually lists it if the dir's
+    mtime has changed since we last looked """
+    global _gModuleManifestDirty
+    global _gModuleGeneration
+    try: mtime = os.stat(d).st_mtime
+    except Exception: return []
+    entry = _gModuleManifest['dirs'].get(d)
+    if entry is not None and entry['mtime'] == mtime:
+        return entry['names']
+    _gModuleGeneration += 1
+    try: names = os.listdir(d)
+    except Exception as e:
+        import errno
+        if (type(e) == OSError
+                and e.errno in (errno.EACCES, errno.ENOENT)):
+            pass # we expect these sometimes..
+        else:
+            bs.printException('error listing dir during '
+                              '_getModulesWithCall(): \''+d+'\'')
+        names = []
+    _gModuleManifest['dirs'][d] = {'mtime': mtime, 'names': names}
+    _gModuleManifestDirty = True
+    return names
+
+def _getScriptInfo(path):
+    """ return which discovery calls a script defines and whether importing
+    it does anything beyond defining things (registering, patching other
+    modules, starting timers...). Scripts are parsed rather than imported
+    and results are reused until the file's contents change. """
+    global _gModuleManifestDirty
+    global _gModuleGeneration
+    st = os.stat(path)
+    entry = _gModuleManifest['files'].get(path)
+    if (entry is not None and entry['mtime'] == st.st_mtime
+            and entry['size'] == st.st_size):
+        return entry
+    import hashlib
+    f = open(path, 'rb')
+    src = f.read()
+    f.close()
+    digest = hashlib.md5(src).hexdigest()
+    if entry is None or entry['hash'] != digest:
+        _gModuleGeneration += 1
+        calls = []
+        try:
+            tree = ast.parse(src.replace('\r\n', '\n'), path)
+            sideEffects = False
+            hasImports = False
+            definesThings = False
+            for node in tree.body:
+                if isinstance(node, (ast.Import, ast.ImportFrom)):
+                    hasImports = True
+                    continue
+                if not (isinstance(node, ast.Expr)
+                        and isinstance(node.value, ast.Str)):
+                    definesThings = True
+                if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+                    if node.name in gModuleDiscoveryCalls:
+                        calls.append(node.name)
+                    # (decorators and base-class expressions run too)
+                    if any(isinstance(n, ast.Call) for d in
+                           getattr(node, 'decorator_list', [])
+                           for n in ast.walk(d)):
+                        sideEffects = True
+                    continue
+                if isinstance(node, ast.Assign):
+                    for t in node.targets:
+                        if isinstance(t, ast.Name):
+                            if t.id in gModuleDiscoveryCalls:
+                                calls.append(t.id)
+                        elif not isinstance(t, (ast.Subscript, ast.Tuple)):
+                            # assigning into something else's attributes
+                            sideEffects = True
+                if isinstance(node, (ast.Assign, ast.Expr)):
+                    if any(isinstance(n, ast.Call) for n in ast.walk(node)):
+                        sideEffects = True
+                    continue
+                sideEffects = True
+            # a script that does nothing but import things is a loader for
+            # mods living elsewhere (packages and such) so it counts too
+            if hasImports and not definesThings:
+                sideEffects = True
+        except Exception:
+            # let the import report whatever is wrong with it
+            sideEffects = True
+        entry = {'hash': digest, 'calls': calls,
+                 'sideEffects': sideEffects}
+    entry['mtime'] = st.st_mtime
+    entry['size'] = st.st_size
+    _gModuleManifest['files'][path] = entry
+    _gModuleManifestDirty = True
+    return entry
+
 def _getModulesWithCall(callName, whiteList=None, blackList=None):
 
     # first off, see if we're allowing low-level mods if we havn't
@@ -1220,27 +1413,19 @@ def _getModulesWithCall(callName, whiteList=None, blackList=None):
     if gAllowingPackageMods is None:
         gAllowingPackageMods = bsInternal._getSetting('Enable Package Mods')
 
+    if _gModuleManifest is None:
+        _loadModuleManifest()
+
     haveMods = False
     env = bs.getEnvironment()
     scriptDirs = [env['systemScriptsDirectory'], env['userScriptsDirectory']]
 
     # if package mods are enabled, tally up all dirs under user-mods that we
     # consider to be 'packages' - we'll import anything we find in them too..
-    extraPackageModFiles = []
     if gAllowingPackageMods:
-        import sys
         d = env['userScriptsDirectory']
 
-        if os.path.isdir(d):
-            try:
-                dirlist = os.listdir(d)
-            except Exception:
-                bs.printException('error listing dir during'
-                                  ' _getModulesWithCall(): \''+d+'\'')
-                dirlist = []
-        else: dirlist = []
-
-        for name in dirlist:
+        for name in _listScriptDir(d):
             packageDir = d+'/'+name
             if os.path.isdir(packageDir) and name != 'sys':
                 # for each valid package we find, add it to the python
@@ -1257,20 +1442,7 @@ def _getModulesWithCall(callName, whiteList=None, blackList=None):
     modules = []
     for i, d in enumerate(scriptDirs):
 
-        if os.path.isdir(d):
-            try: dirlist = os.listdir(d)
-            except Exception as e:
-                import errno
-                if (type(e) == OSError
-                        and e.errno in (errno.EACCES, errno.ENOENT)):
-                    pass # we expect these sometimes..
-                else:
-                    bs.printException('error listing dir during '
-                                      '_getModulesWithCall(): \''+d+'\'')
-                dirlist = []
-        else: dirlist = []
-
-        for name in dirlist:
+        for name in _listScriptDir(d):
             try:
                 if name == 'sys' or name.endswith('.py'):
                     # if there's anything in user-mods or package dirs,
@@ -1296,37 +1468,50 @@ def _getModulesWithCall(callName, whiteList=None, blackList=None):
                                           "found: '"+name+"'; ignoring.")
                                 print errMsg
                                 bs.screenMessage(errMsg, color=(1, 0, 0))
-                            else:
-                                namesImported.add(name)
-                                module = __import__(moduleName)
-
-                                # only look at the module if it contains
-                                # the callable we're after
-                                call = getattr(module, callName, None)
-                                if call is not None and callable(call):
-
-                                    # if this module's API-version doesn't match
-                                    # ours, ignore it (and complain about it)
-                                    ourAPIVersion = 4
-                                    try: moduleAPIVersion = \
-                                       module.bsGetAPIVersion()
-                                    except Exception: moduleAPIVersion = None
-                                    if moduleAPIVersion == ourAPIVersion:
-                                        modules.append(module)
-                                    else:
-                                        try: name = module.__name__
-                                        except Exception: name = str(module)
-                                        txt = bs.Lstr(
-                                            resource='apiVersionErrorText',
-                                            subs=[('${NAME}', name),
-                                                  ('${VERSION_USED}',
-                                                   str(moduleAPIVersion)),
-                                                  ('${VERSION_REQUIRED}',
-                                                   str(ourAPIVersion))])
-                                        bs.screenMessage(txt, color=(1, 0.5, 0))
+                                continue
+                            namesImported.add(name)
+                            info = _getScriptInfo(d+'/'+name)
+
+                            # only import what defines the call we're after;
+                            # other scripts get imported only if they do
+                            # something when imported (mods that patch the
+                            # game, etc) - anything else gets imported
+                            # by whoever uses it
+                            if callName not in info['calls']:
+                                if (info['sideEffects']
+                                        and moduleName not in sys.modules):
+                                    __import__(moduleName)
+                                continue
+                            module = __import__(moduleName)
+
+                            # only look at the module if it contains
+                            # the callable we're after
+                            call = getattr(module, callName, None)
+                            if call is not None and callable(call):
+
+                                # if this module's API-version doesn't match
+                                # ours, ignore it (and complain about it)
+                                ourAPIVersion = 4
+                                try: moduleAPIVersion = \
+                                   module.bsGetAPIVersion()
+                                except Exception: moduleAPIVersion = None
+                                if moduleAPIVersion == ourAPIVersion:
+                                    modules.append(module)
+                                else:
+                                    try: name = module.__name__
+                                    except Exception: name = str(module)
+                                    txt = bs.Lstr(
+                                        resource='apiVersionErrorText',
+                                        subs=[('${NAME}', name),
+                                              ('${VERSION_USED}',
+                                               str(moduleAPIVersion)),
+                                              ('${VERSION_REQUIRED}',
+                                               str(ourAPIVersion))])
+                                    bs.screenMessage(txt, color=(1, 0.5, 0))
             except Exception:
                 bs.printException('Error importing game module \''+name+'\'')
 
+    _saveModuleManifest()
     bsInternal._setHaveMods(haveMods)
     return modules
 
@@ -1440,6 +1625,86 @@ def _getUnOwnedGameTypes():
         bs.printException("error calcing un-owned games")
         return set()
 
+# old game type names -> what they're called now
+gPlaylistTypeAliases = {
+    'Happy_Thoughts.HappyThoughtsGame': 'bsAssault.AssaultGame',
+    'Assault.AssaultGame': 'bsAssault.AssaultGame',
+    'King_of_the_Hill.KingOfTheHillGame': 'bsKingOfTheHill.KingOfTheHillGame',
+    'Capture_the_Flag.CTFGame': 'bsCaptureTheFlag.CTFGame',
+    'Death_Match.DeathMatchGame': 'bsDeathMatch.DeathMatchGame',
+    'ChosenOne.ChosenOneGame': 'bsChosenOne.ChosenOneGame',
+    'Conquest.Conquest': 'bsConquest.ConquestGame',
+    'Conquest.ConquestGame': 'bsConquest.ConquestGame',
+    'Elimination.EliminationGame': 'bsElimination.EliminationGame',
+    'Football.FootballGame': 'bsFootball.FootballTeamGame',
+    'Hockey.HockeyGame': 'bsHockey.HockeyGame',
+    'Keep_Away.KeepAwayGame': 'bsKeepAway.KeepAwayGame',
+    'Race.RaceGame': 'bsRace.RaceGame',
+}
+
+# (playlist hash, session type) -> (module generation, resolved gamespecs)
+_gResolvedPlaylists = {}
+_gMaxResolvedPlaylists = 32
+
+
+def _resolvePlaylist(playlist, sessionType):
+    """ resolves each gamespec in a playlist to its game class with all the
+    settings it defines filled in, dropping ones that can't be resolved;
+    returns a list of (gamespec, game class) tuples. results are cached by
+    playlist contents and session type; don't modify them """
+    try:
+        key = (_getPlaylistHash(playlist), sessionType)
+    except Exception:
+        key = None # (not json-able; just resolve it every time)
+    if key is not None:
+        cached = _gResolvedPlaylists.get(key)
+        if cached is not None and cached[0] == _gModuleGeneration:
+            # make sure nobody's reloaded a game module on us
+            for gamespec, gameClass in cached[1]:
+                module = sys.modules.get(gameClass.__module__)
+                if getattr(module, gameClass.__name__, None) is not gameClass:
+                    break
+            else:
+                return cached[1]
+
+    import bsMap
+    resolved = []
+    for gamespec in playlist:
+        if type(gamespec['type']) not in [str, unicode]:
+            raise Exception("invalid gamespec format")
+        gamespec = copy.deepcopy(gamespec)
+        settings = gamespec['settings']
+        # 'map' used to be called 'level'
+        if 'level' in gamespec:
+            gamespec['map'] = gamespec.pop('level')
+        # we now stuff map into settings instead of it being its own thing...
+        if 'map' in gamespec:
+            settings['map'] = gamespec.pop('map')
+        settings['map'] = bsMap.getFilteredMapName(settings['map'])
+        # ok, for each game in our list, try to import the module and grab
+        # the actual game class
+        try:
+            gamespec['type'] = gPlaylistTypeAliases.get(gamespec['type'],
+                                                        gamespec['type'])
+            gameModuleName, gameClassName = gamespec['type'].split('.')
+            gameModule = __import__(gameModuleName)
+            gameClass = getattr(gameModule, gameClassName)
+
+            # make sure all settings the game defines are present
+            for settingName, setting in gameClass.getSettings(sessionType):
+                if settingName not in settings:
+                    settings[settingName] = setting['default']
+            resolved.append((gamespec, gameClass))
+        except Exception:
+            pass # hmm in what case would we want to report this?...
+
+    if key is not None:
+        if len(_gResolvedPlaylists) >= _gMaxResolvedPlaylists:
+            _gResolvedPlaylists.clear()
+        _gResolvedPlaylists[key] = (_gModuleGeneration, resolved)
+    return resolved
+
+
 def _filterPlaylist(playlist, sessionType, addResolvedType=False,
                     removeUnOwned=True, markUnOwned=False):
     """ returns a filtered version of a playlist - strips out or replaces
@@ -1454,74 +1719,21 @@ def _filterPlaylist(playlist, sessionType, addResolvedType=False,
         unOwnedMaps = []
         unOwnedGameTypes = []
 
-    for i, gamespec in enumerate(copy.deepcopy(playlist)):
-        # 'map' used to be called 'level'
-        if 'level' in gamespec:
-            gamespec['map'] = gamespec['level']
-            del gamespec['level']
-        # we now stuff map into settings instead of it being its own thing...
-        if 'map' in gamespec:
-            gamespec['settings']['map'] = gamespec['map']
-            del gamespec['map']
-        gamespec['settings']['map'] = bsMap.getFilteredMapName(
-            gamespec['settings']['map'])
-        if removeUnOwned and gamespec['settings']['map'] in unOwnedMaps:
+    for resolvedSpec, gameClass in _resolvePlaylist(playlist, sessionType):
+        mapName = resolvedSpec['settings']['map']
+        # skip this one completely if they want to strip un-owned stuff.
+        if removeUnOwned and (mapName in unOwnedMaps
+                              or gameClass in unOwnedGameTypes):
             continue
-        # ok, for each game in our list, try to import the module and grab
-        # the actual game class. add successful ones to our initial list
-        # to present to the user
-        if type(gamespec['type']) in [str, unicode]:
-            try:
-                # do some type filters for backwards compat.
-                if gamespec['type'] == 'Happy_Thoughts.HappyThoughtsGame':
-                    gamespec['type'] = 'bsAssault.AssaultGame'
-                if gamespec['type'] == 'Assault.AssaultGame':
-                    gamespec['type'] = 'bsAssault.AssaultGame'
-                if gamespec['type'] == 'King_of_the_Hill.KingOfTheHillGame':
-                    gamespec['type'] = 'bsKingOfTheHill.KingOfTheHillGame'
-                if gamespec['type'] == 'Capture_the_Flag.CTFGame':
-                    gamespec['type'] = 'bsCaptureTheFlag.CTFGame'
-                if gamespec['type'] == 'Death_Match.DeathMatchGame':
-                    gamespec['type'] = 'bsDeathMatch.DeathMatchGame'
-                if gamespec['type'] == 'ChosenOne.ChosenOneGame':
-                    gamespec['type'] = 'bsChosenOne.ChosenOneGame'
-                if gamespec['type'] == 'Conquest.Conquest':
-                    gamespec['type'] = 'bsConquest.ConquestGame'
-                if gamespec['type'] == 'Conquest.ConquestGame':
-                    gamespec['type'] = 'bsConquest.ConquestGame'
-                if gamespec['type'] == 'Elimination.EliminationGame':
-                    gamespec['type'] = 'bsElimination.EliminationGame'
-                if gamespec['type'] == 'Football.FootballGame':
-                    gamespec['type'] = 'bsFootball.FootballTeamGame'
-                if gamespec['type'] == 'Hockey.HockeyGame':
-                    gamespec['type'] = 'bsHockey.HockeyGame'
-                if gamespec['type'] == 'Keep_Away.KeepAwayGame':
-                    gamespec['type'] = 'bsKeepAway.KeepAwayGame'
-                if gamespec['type'] == 'Race.RaceGame':
-                    gamespec['type'] = 'bsRace.RaceGame'
-                gameModuleName, gameClassName = gamespec['type'].split('.')
-
-                gameModule = __import__(gameModuleName)
-                gameClass = getattr(gameModule, gameClassName)
-
-                # skip this one completely if they want to strip un-owned stuff.
-                if removeUnOwned and gameClass in unOwnedGameTypes: continue
-                if addResolvedType: gamespec['resolvedType'] = gameClass
-                if markUnOwned and gamespec['settings']['map'] in unOwnedMaps:
-                    gamespec['isUnOwnedMap'] = True
-                if markUnOwned and gameClass in unOwnedGameTypes:
-                    gamespec['isUnOwnedGame'] = True
-
-                # make sure all settings the game defines are present
-                neededSettings = gameClass.getSettings(sessionType)
-                for settingName, setting in neededSettings:
-                    if settingName not in gamespec['settings']:
-                        gamespec['settings'][settingName] = setting['default']
-                goodList.append(gamespec)
-            except Exception:
-                pass # hmm in what case would we want to report this?...
-        else:
-            raise Exception("invalid gamespec format")
+        # (callers muck with these, so hand out copies of the cached ones)
+        gamespec = copy.copy(resolvedSpec)
+        gamespec['settings'] = copy.copy(resolvedSpec['settings'])
+        if addResolvedType: gamespec['resolvedType'] = gameClass
+        if markUnOwned and mapName in unOwnedMaps:
+            gamespec['isUnOwnedMap'] = True
+        if markUnOwned and gameClass in unOwnedGameTypes:
+            gamespec['isUnOwnedGame'] = True
+        goodList.append(gamespec)
     return goodList
 
 
@@ -1594,9 +1806,14 @@ def writeConfig(force=False, storeRemote=True):
     bsInternal._markConfigDirty()
 
 def _setLanguage(language, printChange=True, storeToConfig=True):
-    """Set the language used by the game.  Pass None to use OS default."""
-    global _gLanguageTarget
-    global _gLanguageMerged
+    """Set the language used by the game.  Pass None to use OS default.
+    Only the few values the engine needs up front get loaded here; the
+    full resource table is loaded on the first _getResource() call."""
+    global _gLanguage
+    global _gLanguageFlat
+    global _gLanguageTargetKeys
+    global _gLanguageTree
+    startTime = time.time()
     bsConfig = bs.getConfig()
     try: curLanguage = bsConfig['Lang']
     except Exception: curLanguage = None
@@ -1615,28 +1832,86 @@ def _setLanguage(language, printChange=True, storeToConfig=True):
     if language is None:
         language = _getDefaultLanguage()
     try:
-        lEnglish = __import__('bsLanguageEnglish')
-        l = __import__('bsLanguage'+language)
-        if language != 'English': reload(l) # helpful for iterating
+        internalVals, randomNames = _loadLanguageData(language, 'internal')
     except Exception:
         bs.printException('Exception importing language:', language)
         bs.screenMessage("Error setting language to '"
                          + language + "'; see log for details", color=(1, 0, 0))
         switched = False
-        l = None
-    # create an attrdict of *just* our target language
-    _gLanguageTarget = AttrDict()
-    _addToAttrDict(_gLanguageTarget,
-                   l.values if l is not None else lEnglish.values)
-    # create an attrdict of our target languaged overlaid on our base (english)
-    languages = []
-    if l is not None: languages.append(l)
-    if language != 'English': languages.append(__import__('bsLanguageEnglish'))
-    languages.reverse()
+        language = 'English'
+        internalVals, randomNames = _loadLanguageData(language, 'internal')
+
+    # drop any previously loaded tables (and anything evaluated with them);
+    # they get pulled in again on demand for the new language
+    _gLstrCache.clear()
+    _gLanguage = language
+    _gLanguageFlat = None
+    _gLanguageTargetKeys = None
+    _gLanguageTree = None
+
+    bsInternal._setInternalLanguageKeys(internalVals, randomNames)
+    _gLanguageStats['language'] = language
+    _gLanguageStats['setTime'] = (time.time()-startTime)*1000.0
+    if switched and printChange:
+        bs.screenMessage(bs.Lstr(resource='languageSetText',
+                                 subs=[('${LANGUAGE}', bs.Lstr(
+                                     translate=('languages', language)))]),
+                         color=(0, 1, 0))
+
+def _getLanguageCachePath(language, part):
+    return os.path.join(
+        os.path.dirname(bs.getEnvironment()['configFilePath']),
+        'langCache', language+'.'+part)
+
+def _getLanguageSourceStamp(language):
+    # the cache is valid as long as the language sources it was built from
+    # haven't changed
+    env = bs.getEnvironment()
+    stamp = [_gLanguageCacheVersion]
+    names = ['bsLanguageEnglish.py']
+    if language != 'English':
+        names.append('bsLanguage'+language+'.py')
+    for name in names:
+        for d in (env['userScriptsDirectory'], env['systemScriptsDirectory']):
+            try: st = os.stat(os.path.join(d, name))
+            except Exception: continue
+            stamp.append((name, int(st.st_mtime), st.st_size))
+    return tuple(stamp)
+
+def _loadLanguageData(language, part):
+    """ return one compiled part ('internal', 'flat' or 'tree') of a language,
+    reading it from the on-disk cache or recompiling as needed """
+    stamp = _getLanguageSourceStamp(language)
+    try:
+        f = open(_getLanguageCachePath(language, part), 'rb')
+        try:
+            if marshal.load(f) == stamp:
+                _gLanguageStats['compiled'] = False
+                return marshal.load(f)
+        finally:
+            f.close()
+    except Exception:
+        pass
+    return _compileLanguage(language, stamp)[part]
+
+def _compileLanguage(language, stamp):
+    """ build flat/tree/internal tables for a language (overlaid on english)
+    and write them to the cache """
+    lEnglish = __import__('bsLanguageEnglish')
+    languages = [lEnglish]
+    if language != 'English':
+        l = __import__('bsLanguage'+language)
+        reload(l) # helpful for iterating
+        languages.append(l)
+
+    # merge into an attrdict first; this validates the values for us
     lFull = AttrDict()
     for l in languages:
         _addToAttrDict(lFull, l.values)
-    _gLanguageMerged = lFull
+    flat = {}
+    _flattenLanguageDict(flat, lFull, '', decode=True)
+    targetKeys = {}
+    _flattenLanguageDict(targetKeys, languages[-1].values, '', withDicts=True)
 
     # pass some keys/values in for low level code to use;
     # start with everything in ther 'internal' section...
@@ -1649,15 +1924,56 @@ def _setLanguage(language, printChange=True, storeToConfig=True):
                   'replayVersionErrorText', 'replayReadErrorText']:
         internalVals.append((value, lFull[value]))
     internalVals.append(('axisText', lFull['configGamepadWindow']['axisText']))
-    randomNames = [n.strip() for n in _gLanguageMerged['randomPlayerNamesText']\
+    randomNames = [n.strip() for n in lFull['randomPlayerNamesText']\
                    .split(',')]
     randomNames = [n for n in randomNames if n != '']
-    bsInternal._setInternalLanguageKeys(internalVals, randomNames)
-    if switched and printChange:
-        bs.screenMessage(bs.Lstr(resource='languageSetText',
-                                 subs=[('${LANGUAGE}', bs.Lstr(
-                                     translate=('languages', language)))]),
-                         color=(0, 1, 0))
+
+    data = {'internal': (internalVals, randomNames),
+            'flat': (flat, targetKeys.keys()),
+            'tree': _plainLanguageDict(lFull)}
+    try:
+        d = os.path.dirname(_getLanguageCachePath(language, 'flat'))
+        if not os.path.exists(d):
+            os.makedirs(d)
+        for part, value in data.items():
+            path = _getLanguageCachePath(language, part)
+            f = open(path+'.tmp', 'wb')
+            marshal.dump(stamp, f, 2)
+            marshal.dump(value, f, 2)
+            f.close()
+            os.rename(path+'.tmp', path)
+    except Exception:
+        bs.printException('error writing language cache for', language)
+    _gLanguageStats['compiled'] = True
+    return data
+
+def _flattenLanguageDict(dst, src, prefix, decode=False, withDicts=False):
+    for key, value in src.items():
+        path = prefix+key
+        try: path = intern(path)
+        except Exception: pass
+        if isinstance(value, dict):
+            if withDicts:
+                dst[path] = True
+            _flattenLanguageDict(dst, value, path+'.', decode, withDicts)
+        else:
+            if decode and type(value) is str:
+                value = value.decode('utf-8', errors='ignore')
+            dst[path] = value if not withDicts else True
+
+def _plainLanguageDict(src):
+    # marshal only handles plain dicts
+    return dict((k, _plainLanguageDict(v) if isinstance(v, dict) else v)
+                for k, v in src.items())
+
+def _getLanguageStats():
+    """ timing/size info for the currently loaded language (handy for
+    measuring startup costs) """
+    stats = dict(_gLanguageStats)
+    stats['flatLoaded'] = _gLanguageFlat is not None
+    stats['treeLoaded'] = _gLanguageTree is not None
+    stats['rss'] = _getRSS()
+    return stats
 
 gLastInGameAdRemoveMessageShowTime = None
 
@@ -1742,69 +2058,66 @@ def getLanguage(returnNoneForDefault=False):
     return language
 
 
+def _ensureLanguageTable():
+    global _gLanguageFlat
+    global _gLanguageTargetKeys
+
+    # if we have no language set, go ahead and set it
+    if _gLanguage is None:
+        language = getLanguage()
+        try: _setLanguage(language, printChange=False, storeToConfig=False)
+        except Exception:
+            bs.printException('exception setting language to', language)
+            # try english as a fallback
+            if (language != 'English'):
+                print 'Resorting to fallback language (English)'
+                try: _setLanguage('English', printChange=False,
+                                  storeToConfig=False)
+                except Exception as e:
+                    print 'Error setting language to English fallback: ', e
+    t = time.time()
+    flat, targetKeys = _loadLanguageData(_gLanguage, 'flat')
+    _gLanguageTargetKeys = frozenset(targetKeys)
+    _gLanguageFlat = flat
+    _gLanguageStats['loadTime'] = (time.time()-t)*1000.0
+    _gLanguageStats['entries'] = len(flat)
+
+def _getResourceValue(resource):
+    global _gLanguageTree
+    try: return _gLanguageFlat[resource]
+    except KeyError:
+        # not a single value; hand back the matching section
+        # (the nested version is only loaded if someone asks for one)
+        if _gLanguageTree is None:
+            tree = AttrDict()
+            _addToAttrDict(tree, _loadLanguageData(_gLanguage, 'tree'))
+            _gLanguageTree = tree
+        values = _gLanguageTree
+        for d in resource.split('.'): values = values[d]
+        return values
+
 def _getResource(resource, fallbackResource=None, fallbackValue=None):
     try:
-        global _gLanguageTarget
-        global _gLanguageMerged
-
-        # if we have no language set, go ahead and set it
-        if _gLanguageMerged is None:
-            language = getLanguage()
-            try: _setLanguage(language, printChange=False, storeToConfig=False)
-            except Exception:
-                bs.printException('exception setting language to', language)
-                # try english as a fallback
-                if (language != 'English'):
-                    print 'Resorting to fallback language (English)'
-                    try: _setLanguage('English', printChange=False,
-                                      storeToConfig=False)
-                    except Exception as e:
-                        print 'Error setting language to English fallback: ', e
+        if _gLanguageFlat is None:
+            _ensureLanguageTable()
 
         # if they provided a fallbackResource value, try the
-        # target-language-only dict first and then fall back to trying the
-        # fallbackResource value in the merged dict.
+        # target-language value first and then fall back to trying the
+        # fallbackResource value in the merged table.
         if fallbackResource is not None:
-            try:
-                values = _gLanguageTarget
-                splits = resource.split('.')
-                dicts = splits[:-1]
-                key = splits[-1]
-                for d in dicts: values = values[d]
-                val = values[key]
-                if uni and type(val) is str:
-                    val = val.decode('utf-8', errors='ignore')
-                return val
+            if resource in _gLanguageTargetKeys:
+                return _getResourceValue(resource)
+            # FIXME - shouldn't we try the fallback resource in the merged
+            # dict AFTER we try the main resource in the merged dict?...
+            try: return _getResourceValue(fallbackResource)
             except Exception:
-                # FIXME - shouldn't we try the fallback resource in the merged
-                # dict AFTER we try the main resource in the merged dict?...
-                try:
-                    values = _gLanguageMerged
-                    splits = fallbackResource.split('.')
-                    dicts = splits[:-1]
-                    key = splits[-1]
-                    for d in dicts: values = values[d]
-                    val = values[key]
-                    if uni and type(val) is str:
-                        val = val.decode('utf-8', errors='ignore')
-                    return val
+                # if we got nothing for fallbackResource, default to the
+                # normal code which checks or primary value in the merged
+                # table; there's a chance we can get an english value for
+                # it (which we weren't looking for the first time through)
+                pass
 
-                except Exception:
-                    # if we got nothing for fallbackResource, default to the
-                    # normal code which checks or primary value in the merge
-                    # dict; there's a chance we can get an english value for
-                    # it (which we weren't looking for the first time through)
-                    pass
-
-        values = _gLanguageMerged
-        splits = resource.split('.')
-        dicts = splits[:-1]
-        key = splits[-1]
-        for d in dicts: values = values[d]
-        val = values[key]
-        if uni and type(val) is str:
-            val = val.decode('utf-8', errors='ignore')
-        return val
+        return _getResourceValue(resource)
 
     except Exception:
         # ok looks like we couldn't find our main or fallback resource anywhere.
@@ -1814,7 +2127,16 @@ def _getResource(resource, fallbackResource=None, fallbackValue=None):
         raise Exception("resource not found: '"+resource+"'")
 
 def _translate(category, s, raiseExceptions=False, printErrors=False):
-    try: translated = _getResource('translations')[category][s]
+    try:
+        if _gLanguageFlat is None:
+            _ensureLanguageTable()
+        # translations are always single values, so we go straight to the
+        # flat table; misses (custom game names and such) are common and
+        # shouldn't pull in the nested tree
+        resource = 'translations.'+category+'.'+s
+        try: translated = _gLanguageFlat[resource]
+        except KeyError:
+            raise Exception("resource not found: '"+resource+"'")
     except Exception as e:
         if raiseExceptions: raise e
         if printErrors:
@@ -2761,14 +3083,230 @@ def getNormalizedColor(color):
     mult = 1.0/max(colorBiased)
     return tuple(c*mult for c in colorBiased)
 
-def garbageCollect(sessionEnd=True):
-    gc.collect()
-    # can be handy to print this to check for leaks between games
-    if 0: print 'PY OBJ COUNT', len(gc.get_objects())
+# garbage-collection management:
+# in 'full' mode (the default) we run a complete gc.collect() whenever an
+# activity or session goes down and walk gc.get_objects() looking for leaks.
+# that walks every object in the process, which on a long-running server
+# (big stats dicts, language tables, actor graphs) shows up as a hitch
+# during transitions.
+# in 'managed' mode we instead collect once and freeze everything alive at
+# that point out of the collector, run the young generations ourself in small
+# slices from a real-time timer (skipping slices that would blow our time
+# budget), and only do full collections and leak checks on a sample of
+# teardowns, spread out across timer ticks.
+_gGCMode = 'full'
+_gGCSliceTimer = None
+_gGCLeakCheckTimer = None
+_gGCTrackedObjects = weakref.WeakSet()
+_gGCTeardownCount = 0
+_gGCSessionEndCount = 0
+_gGCFullCollectPending = False
+
+# how often (real ms) the slice timer runs
+gGCSliceInterval = 100
+# max time (ms) we're willing to spend in a single collection slice;
+# slices for a generation whose last pause exceeded this get spaced out
+gGCSliceBudget = 2.0
+# young-generation object counts above which a slice collects that generation
+gGCSliceThresholds = (700, 10)
+# run a full collection every this many activity teardowns
+gGCFullCollectEvery = 8
+# run a leak check on every Nth session end
+gGCLeakCheckEvery = 4
+# how many tracked objects a single leak-check tick looks at
+gGCLeakCheckChunk = 200
+
+_gGCStats = {'collections': [0, 0, 0],
+             'collected': [0, 0, 0],
+             'pauseTotal': 0.0,
+             'pauseMax': 0.0,
+             'pauseLast': 0.0,
+             'slicesSkipped': 0,
+             'leakChecks': 0,
+             'leaksFound': 0}
+_gGCLastPause = [0.0, 0.0, 0.0]
+
+
+def getGCMode():
+    """
+    category: General Utility Functions
+
+    Returns the current garbage-collection mode ('full' or 'managed').
+    """
+    return _gGCMode
+
+
+def setGCMode(mode):
+    """
+    category: General Utility Functions
+
+    Sets how python garbage collection is run.
+    'full' runs a complete collection at every activity teardown.
+    'managed' freezes long-lived startup objects out of the collector and
+    runs the young generations in small budgeted slices instead.
+    Calling this with the current mode does nothing.
+    """
+    global _gGCMode
+    global _gGCSliceTimer
+    if mode not in ('full', 'managed'):
+        raise Exception('invalid gc mode: '+str(mode))
+    if mode == _gGCMode:
+        return
+    _gGCMode = mode
+    if mode == 'managed':
+        _gcFreeze()
+        gc.disable()
+        with bs.Context('UI'):
+            _gGCSliceTimer = bs.Timer(gGCSliceInterval, _gcSlice,
+                                      timeType='real', repeat=True)
+    else:
+        _gGCSliceTimer = None
+        _gGCTrackedObjects.clear()
+        if hasattr(gc, 'unfreeze'):
+            gc.unfreeze()
+        gc.enable()
+
+
+def getGCStats():
+    """
+    category: General Utility Functions
+
+    Returns a dict of garbage-collection stats: collection and
+    collected-object counts per generation, pause times in milliseconds,
+    and leak-check counts.
+    """
+    stats = copy.deepcopy(_gGCStats)
+    stats['mode'] = _gGCMode
+    stats['counts'] = list(gc.get_count())
+    stats['tracked'] = len(_gGCTrackedObjects)
+    return stats
+
+
+def _gcFreeze():
+    # get rid of whatever startup garbage exists and then take everything
+    # left out of future collections; interpreters without gc.freeze() just
+    # get the collection (gen 2 only gets run explicitly in managed mode
+    # anyway)
+    _gcCollect(2)
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+
+
+def _gcCollect(generation):
+    t = time.time()
+    count = gc.collect(generation)
+    pause = (time.time()-t)*1000.0
+    _gGCLastPause[generation] = pause
+    s = _gGCStats
+    s['collections'][generation] += 1
+    s['collected'][generation] += count
+    s['pauseTotal'] += pause
+    s['pauseLast'] = pause
+    if pause > s['pauseMax']:
+        s['pauseMax'] = pause
     if len(gc.garbage) > 0:
         print 'PTHON GC FOUND', len(gc.garbage), 'UNCOLLECTABLE OBJECTS:'
         for i, obj in enumerate(gc.garbage):
             print str(i)+':', obj
+    return count
+
+
+def _gcSlice():
+    global _gGCFullCollectPending
+    if _gGCFullCollectPending:
+        _gGCFullCollectPending = False
+        _gcCollect(2)
+        return
+    counts = gc.get_count()
+    if counts[1] > gGCSliceThresholds[1]:
+        generation = 1
+    elif counts[0] > gGCSliceThresholds[0]:
+        generation = 0
+    else:
+        return
+
+    # if this generation's last pause went over budget, fall back to
+    # the younger one (or skip this tick if there is none) so a single
+    # tick never costs much more than the budget
+    if _gGCLastPause[generation] > gGCSliceBudget:
+        _gGCLastPause[generation] *= 0.5
+        if generation == 0:
+            _gGCStats['slicesSkipped'] += 1
+            return
+        generation = 0
+    _gcCollect(generation)
+
+
+def _gcTrackObject(obj):
+    """ register a session/activity/actor for managed-mode leak checks """
+    if _gGCMode == 'managed':
+        _gGCTrackedObjects.add(obj)
+
+
+def _gcStartLeakCheck(when):
+    global _gGCLeakCheckTimer
+
+    # check what's alive now a chunk at a time (dead objects drop out of
+    # the set by themselves); anything created from here on isn't part of
+    # this check
+    refs = [weakref.ref(obj) for obj in _gGCTrackedObjects]
+    _gGCStats['leakChecks'] += 1
+    pos = [0]
+
+    def _step():
+        global _gGCLeakCheckTimer
+        global _gPrintedLiveObjectWarning
+        chunk = refs[pos[0]:pos[0]+gGCLeakCheckChunk]
+        pos[0] += gGCLeakCheckChunk
+        for r in chunk:
+            obj = r()
+            if obj is None:
+                continue
+            if isinstance(obj, bs.Session):
+                if obj is bsInternal._getForegroundHostSession():
+                    continue
+                kind = 'Session'
+            elif isinstance(obj, bs.Activity):
+                if not obj.isFinalized():
+                    continue
+                kind = 'Activity'
+            elif isinstance(obj, bs.Actor):
+                activity = obj.getActivity(exceptionOnNone=False)
+                if activity is not None and not activity.isFinalized():
+                    continue
+                kind = 'Actor'
+            else:
+                continue
+            _gGCStats['leaksFound'] += 1
+            if not _gPrintedLiveObjectWarning:
+                _gPrintedLiveObjectWarning = True
+                print 'ERROR:', kind, 'found', when, ':', obj
+        if pos[0] >= len(refs):
+            _gGCLeakCheckTimer = None
+
+    with bs.Context('UI'):
+        _gGCLeakCheckTimer = bs.Timer(gGCSliceInterval, _step,
+                                      timeType='real', repeat=True)
+
+
+def garbageCollect(sessionEnd=True):
+    if _gGCMode == 'managed':
+        global _gGCTeardownCount
+        global _gGCSessionEndCount
+        global _gGCFullCollectPending
+        # we're likely mid-transition here; just note what needs doing
+        # and let the slice timer take care of it
+        _gGCTeardownCount += 1
+        if sessionEnd or _gGCTeardownCount % gGCFullCollectEvery == 0:
+            _gGCFullCollectPending = True
+        if sessionEnd:
+            _gGCSessionEndCount += 1
+            if _gGCSessionEndCount % gGCLeakCheckEvery == 0:
+                _gcStartLeakCheck('after session shutdown')
+        return
+    _gcCollect(2)
+    # can be handy to print this to check for leaks between games
+    if 0: print 'PY OBJ COUNT', len(gc.get_objects())
     if sessionEnd:
         printLiveObjectWarnings('after session shutdown')
 
@@ -4398,9 +4936,18 @@ def _getIPAddressType(addr):
 
 _gServerConfigDirty = False
 
-def _configServer():
+# server config values that _configServer() applies on the spot; changing
+# anything else requires a new host-session
+# (playlistCode is handled once its playlist has been imported)
+_gServerConfigLiveKeys = set(['language', 'autoBalanceTeams', 'gcMode',
+                              'maxPartySize', 'partyName', 'statsURL',
+                              'partyIsPublic', 'playlistCode', 'metrics',
+                              'logLevels', 'traceEvents'])
+
+def _configServer(changedKeys=None):
     """apply server config changes that can always take effect immediately
-    (party name, etc)"""
+    (party name, etc); changedKeys can be a set of the config keys that
+    changed (if known)"""
     config = copy.deepcopy(_gServerConfig)
 
     # NOTE - soon clients should always be able to view in their own languages
@@ -4411,6 +4958,13 @@ def _configServer():
 
     bs.getConfig()['Auto Balance Teams'] = config.get('autoBalanceTeams', True)
 
+    setGCMode(config.get('gcMode', 'full'))
+
+    bsMetrics.setEnabled(config.get('metrics', False))
+    bsLog.setLevels(config.get('logLevels', {}))
+    bsTrace.setEnabled(config.get('traceEvents', False), os.path.join(
+        os.path.dirname(bs.getEnvironment()['configFilePath']), 'traces'))
+
     bsInternal._setPublicPartyMaxSize(config.get('maxPartySize', 9))
     bsInternal._setPublicPartyName(config.get('partyName', 'party'))
     bsInternal._setPublicPartyStatsURL(config.get('statsURL', ''));
@@ -4420,14 +4974,63 @@ def _configServer():
     if not _gRunServerFirstRun:
         print 'server config updated.'
 
-    # FIXME - we could avoid setting this as dirty if the only changes have been
-    # ones here we can apply immediately.  (could reduce cases where players
-    # have to rejoin)
+    # we can skip kicking off a new session if the only changes have been
+    # ones we just applied (saves players having to rejoin)
     global _gServerConfigDirty
-    _gServerConfigDirty = True
+    if changedKeys is None or not changedKeys <= _gServerConfigLiveKeys:
+        _gServerConfigDirty = True
 
 _gRunServerFirstRun = True
 
+# while serving we periodically write a little status file to our config
+# dir so whatever launched us (the server wrapper) can tell how we're doing
+# and pick good times to restart us
+_gServerStatusInterval = 5000
+_gServerStatusTimer = None
+_gServerStatus = {'scoreScreens':0}
+_gServerQuitting = False
+
+def _getServerStatusPath():
+    return os.path.join(
+        os.path.dirname(bs.getEnvironment()['configFilePath']),
+        'serverStatus.json')
+
+def _getServerPartySize():
+    # (doesn't count the host)
+    return len([c for c in bsClients.getClients() if c.clientID != -1])
+
+def _updateServerStatus():
+    global _gServerQuitting
+    # (also keeps the client registry from holding on to departed clients)
+    bsClients.refresh()
+    partySize = _getServerPartySize()
+
+    # if we've been asked to quit and there's nobody here to finish a series
+    # for, there's no reason to wait around for one to end
+    if (_gServerConfig.get('quit', False) and partySize == 0
+            and not _gServerQuitting):
+        print ('Exiting for server-'
+               + ('restart' if _gServerConfig.get('quitReason')
+                  == 'restarting' else 'shutdown')
+               + ' (party is empty) at ' + time.strftime('%c'))
+        _gServerQuitting = True
+        bs.quit()
+
+    status = dict(_gServerStatus)
+    status['time'] = time.time()
+    status['partySize'] = partySize
+    if bsMetrics.gEnabled:
+        bsMetrics._sample(partySize)
+        status['metrics'] = bsMetrics._getMetrics()
+    path = _getServerStatusPath()
+    try:
+        _writeFileAtomically(path, json.dumps(status))
+    except Exception:
+        printErrorOnce('error writing server status to '+path)
+
+def _noteServerScoreScreen():
+    _gServerStatus['scoreScreens'] += 1
+
 def _runServer():
     """kick off a host-session based on the current server config"""
     import bsTeamGame
@@ -4444,7 +5047,10 @@ def _runServer():
     elif sessionTypeName == 'teams': sessionType = bs.TeamsSession
     else: raise Exception('invalid sessionType value: '+sessionTypeName)
 
-    if bsInternal._getAccountState() != 'SIGNED_IN':
+    # (a cached playlist can start us up before we're signed in; that's fine
+    # since its check-in request is still waiting on that)
+    if (bsInternal._getAccountState() != 'SIGNED_IN'
+            and _gRunServerPlaylistFetch is None):
         print ('WARNING: _runServer() expects to run '
                'with a signed in server account')
 
@@ -4492,95 +5098,290 @@ def _runServer():
                                              'from the internet.')
         serverGet('bsAccessCheck', {'port':bsInternal._getGamePort()},
                   callback=accessCheckResponse)
+        import bsServerHooks
+        bsServerHooks._finishImportReport()
     _gRunServerFirstRun = False
     _gServerConfigDirty = False
 _gRunServerWaitTimer = None
 _gRunServerPlaylistFetch = None
 _gLaunchedServer = False
 
+# last config version we got from configServerDelta()
+_gServerConfigVersion = 0
+
+# the result of our last shared-playlist import; this stands in for the
+# config's sessionType/playlistName as long as its playlistCode is unchanged
+_gServerPlaylist = None
+
+def _getPlaylistCacheDir():
+    # shared playlists we've imported are kept here so restarts don't have to
+    # wait on the master server; playlists are stored by content hash and
+    # index.json maps codes to them
+    return os.path.join(
+        os.path.dirname(bs.getEnvironment()['configFilePath']),
+        'playlistCache')
+
+def _getPlaylistHash(playlist):
+    import hashlib
+    return hashlib.sha1(json.dumps(playlist, sort_keys=True)).hexdigest()
+
+def _readPlaylistCacheIndex():
+    try:
+        f = open(os.path.join(_getPlaylistCacheDir(), 'index.json'))
+        try: return json.loads(f.read())
+        finally: f.close()
+    except Exception:
+        return {}
+
+def _readCachedPlaylist(playlistCode):
+    """ returns the cache entry for a playlist code (a dict of playlistType,
+    playlistName, hash and playlist) or None """
+    entry = _readPlaylistCacheIndex().get(str(playlistCode))
+    if entry is None:
+        return None
+    try:
+        f = open(os.path.join(_getPlaylistCacheDir(), entry['hash']+'.json'))
+        try: playlist = json.loads(f.read())
+        finally: f.close()
+    except Exception:
+        return None
+    # (don't trust a corrupted copy)
+    if _getPlaylistHash(playlist) != entry['hash']:
+        return None
+    entry = dict(entry)
+    entry['playlist'] = playlist
+    return entry
+
+def _cachePlaylist(playlistCode, playlistType, playlistName, playlist):
+    """ store a fetched playlist; returns its hash """
+    cacheDir = _getPlaylistCacheDir()
+    digest = _getPlaylistHash(playlist)
+    try:
+        if not os.path.exists(cacheDir):
+            os.makedirs(cacheDir)
+        path = os.path.join(cacheDir, digest+'.json')
+        if not os.path.exists(path):
+            _writeFileAtomically(path, json.dumps(playlist))
+        index = _readPlaylistCacheIndex()
+        index[str(playlistCode)] = {'playlistType':playlistType,
+                                    'playlistName':playlistName,
+                                    'hash':digest}
+        _writeFileAtomically(os.path.join(cacheDir, 'index.json'),
+                             json.dumps(index))
+        # drop playlists nothing refers to any more
+        used = set([e['hash']+'.json' for e in index.values()])
+        for name in os.listdir(cacheDir):
+            if name.endswith('.json') and name != 'index.json' \
+                    and name not in used:
+                os.remove(os.path.join(cacheDir, name))
+    except Exception:
+        bs.printException('error caching playlist '+str(playlistCode))
+    return digest
+
+def _writeFileAtomically(path, data):
+    f = open(path+'.tmp', 'w')
+    f.write(data)
+    f.close()
+    if os.name == 'nt' and os.path.exists(path):
+        os.remove(path)
+    os.rename(path+'.tmp', path)
+
+def _usePlaylist(playlistCode, playlistType, playlistName):
+    """ point the server config at an imported playlist """
+    global _gServerPlaylist
+    typeName = ('teams' if playlistType == 'Team Tournament'
+                else 'ffa' if playlistType == 'Free-for-All' else '??')
+    _gServerPlaylist = {'playlistCode':playlistCode,
+                        'sessionType':typeName,
+                        'playlistName':playlistName}
+    _gServerConfig['sessionType'] = typeName
+    _gServerConfig['playlistName'] = playlistName
+    return typeName
+
+def _fetchPlaylist(playlistCode, callback):
+    """ import a shared playlist from the master server; callback gets the
+    result (or None on failure) """
+    bsInternal._addTransaction({'type':'IMPORT_PLAYLIST',
+                                'code':playlistCode,
+                                'overwrite':True},
+                               callback=callback)
+    bsInternal._runTransactions()
+
 def configServer(configFile=None):
     """ utility function to run the game in server-mode """
 
-    global _gServerConfig
-    global _gLaunchedServer
-
-    # read and store the new server config and then delete the file it came from
+    # read the new server config and then delete the file it came from
     if configFile is not None:
         f = open(configFile)
-        _gServerConfig = json.loads(f.read())
+        config = json.loads(f.read())
         f.close()
         os.remove(configFile)
     else:
-        _gServerConfig = {}
+        config = {}
+    _setServerConfig(config)
+
+def configServerDelta(delta):
+    """
+    Like configServer() but takes just the changes since the last call as a
+    json string; used by the server wrapper to update a running server.
+
+    The delta contains a 'version' (which increases by one with each delta),
+    a dict of new values under 'set', and optionally a list of keys to remove
+    under 'unset'. If 'reset' is True the delta replaces the config entirely.
+    """
+    global _gServerConfigVersion
+    delta = json.loads(delta)
+    version = delta['version']
+    if delta.get('reset', False):
+        config = {}
+    else:
+        if version <= _gServerConfigVersion:
+            print ('ignoring out-of-date server config delta '+str(version)
+                   +' (have '+str(_gServerConfigVersion)+')')
+            return
+        if version != _gServerConfigVersion+1:
+            print ('WARNING: server config deltas '+str(_gServerConfigVersion+1)
+                   +' through '+str(version-1)+' went missing')
+        config = dict(_gServerConfig)
+    _gServerConfigVersion = version
+    config.update(delta.get('set', {}))
+    for key in delta.get('unset', []):
+        config.pop(key, None)
+    _setServerConfig(config)
+
+def _setServerConfig(config):
+    """ swap in a new server config and apply whatever changed in it """
+
+    # hang on to what we got from our playlist import if it still applies
+    if (_gServerPlaylist is not None
+            and config.get('playlistCode')
+            == _gServerPlaylist['playlistCode']):
+        config['sessionType'] = _gServerPlaylist['sessionType']
+        config['playlistName'] = _gServerPlaylist['playlistName']
+
+    changedKeys = set([key for key in set(config) | set(_gServerConfig)
+                       if config.get(key) != _gServerConfig.get(key)])
+
+    # (update in place; other modules may be holding on to it)
+    _gServerConfig.clear()
+    _gServerConfig.update(config)
 
     # make note if they want us to import a playlist;
     # we'll need to do that first if so
     global _gRunServerPlaylistFetch
-    playlist_code = _gServerConfig.get('playlistCode')
-    if playlist_code is not None:
-        _gRunServerPlaylistFetch = {'sentRequest':False,
-                                    'gotResponse':False,
-                                    'playlistCode':str(playlist_code)}
+    if 'playlistCode' in changedKeys:
+        playlistCode = _gServerConfig.get('playlistCode')
+        if playlistCode is not None:
+            _gRunServerPlaylistFetch = {'sentRequest':False,
+                                        'gotResponse':False,
+                                        'playlistCode':str(playlistCode),
+                                        'cachedHash':None}
+            # if we've got it cached we can run that right away and just
+            # check in the background that it hasn't changed
+            cached = _readCachedPlaylist(playlistCode)
+            if cached is not None:
+                playlists = bs.getConfig().setdefault(
+                    cached['playlistType']+' Playlists', {})
+                playlists[cached['playlistName']] = cached['playlist']
+                _usePlaylist(playlistCode, cached['playlistType'],
+                             cached['playlistName'])
+                _gRunServerPlaylistFetch['cachedHash'] = cached['hash']
+                print ('Using cached playlist \''+cached['playlistName']
+                       +'\' for shared-playlist '+str(playlistCode)+'.')
+                changedKeys |= set(['sessionType', 'playlistName'])
+        else:
+            _gRunServerPlaylistFetch = None
 
     # apply config stuff that can take effect immediately (party name, etc)
-    _configServer()
+    _configServer(changedKeys)
 
     # launch the server only the first time through;
     # after that it will be self-sustaining
-    if not _gLaunchedServer:
-
-        # now sit around until we're signed in and then kick off the server
-        global _gRunServerWaitTimer
+    # (we still need our wait timer later on for playlist imports though)
+    global _gRunServerWaitTimer
+    global _gLaunchedServer
+    if not _gLaunchedServer or (_gRunServerPlaylistFetch is not None
+                                and _gRunServerWaitTimer is None):
         with bs.Context('UI'):
-            def doIt():
-                global _gRunServerWaitTimer
-                global _gRunServerPlaylistFetch
-                if bsInternal._getAccountState() == 'SIGNED_IN':
-                    can_launch = False
-                    # if we're trying to fetch a playlist, we do that first
-                    if _gRunServerPlaylistFetch is not None:
-
-                        # send request if we havn't
-                        if not _gRunServerPlaylistFetch['sentRequest']:
-
-                            def onPlaylistFetchResponse(result):
-                                if result is None:
-                                    print 'Error fetching playlist; aborting.'
-                                    sys.exit(-1)
-
-                                # once we get here we simply modify our
-                                # config to use this playlist
-                                typeName = ('teams' if result['playlistType']
-                                            == 'Team Tournament' else 'ffa'
-                                            if result['playlistType'] ==
-                                            'Free-for-All' else '??')
-                                print ('Playlist \''+result['playlistName']
-                                       +'\' ('+typeName
-                                       +') downloaded; running...')
-                                _gRunServerPlaylistFetch['gotResponse'] = True
-                                _gServerConfig['sessionType'] = typeName
-                                _gServerConfig['playlistName'] = \
-                                    result['playlistName']
-                            print ('Requesting shared-playlist '+str(
-                                _gRunServerPlaylistFetch['playlistCode'])+'...')
-                            _gRunServerPlaylistFetch['sentRequest'] = True
-                            bsInternal._addTransaction(
-                                { 'type':'IMPORT_PLAYLIST',
-                                  'code':
-                                  _gRunServerPlaylistFetch['playlistCode'],
-                                  'overwrite':True},
-                                callback=onPlaylistFetchResponse)
-                            bsInternal._runTransactions()
-                        # if we got a valid result, forget the fetch ever
-                        # existed and move on..
-                        if _gRunServerPlaylistFetch['gotResponse']:
-                            _gRunServerPlaylistFetch = None
-                            can_launch = True
-                    else:
-                        can_launch = True
-                    if can_launch:
-                        _gRunServerWaitTimer = None
-                        bs.pushCall(_runServer)
-            _gRunServerWaitTimer = bs.Timer(250, doIt,
+            _gRunServerWaitTimer = bs.Timer(250, _runServerWaitTick,
                                             timeType='real', repeat=True)
+            if not _gLaunchedServer:
+                global _gServerStatusTimer
+                _gServerStatusTimer = bs.Timer(_gServerStatusInterval,
+                                               _updateServerStatus,
+                                               timeType='real', repeat=True)
         _gLaunchedServer = True
+
+def _runServerWaitTick():
+    # sit around until we're signed in (and have any playlist we want) and
+    # then kick off the server; if we've got the playlist cached we start
+    # right away and just check on it once we're signed in
+    global _gRunServerWaitTimer
+    global _gRunServerPlaylistFetch
+    signedIn = (bsInternal._getAccountState() == 'SIGNED_IN')
+
+    # send our playlist request if we havn't
+    if (signedIn and _gRunServerPlaylistFetch is not None
+            and not _gRunServerPlaylistFetch['sentRequest']):
+        fetch = _gRunServerPlaylistFetch
+
+        def onPlaylistFetchResponse(result):
+            global _gServerConfigDirty
+            global _gRunServerPlaylistFetch
+            fetch['gotResponse'] = True
+            if _gRunServerPlaylistFetch is fetch:
+                _gRunServerPlaylistFetch = None
+            if result is None:
+                if fetch['cachedHash'] is not None:
+                    print ('Error fetching playlist; '
+                           'sticking with the cached copy.')
+                    return
+                print 'Error fetching playlist; aborting.'
+                sys.exit(-1)
+
+            # (ignore it if they've since asked for something else)
+            if (str(_gServerConfig.get('playlistCode'))
+                    != fetch['playlistCode']):
+                return
+            playlist = bs.getConfig().get(
+                result['playlistType']+' Playlists', {}).get(
+                    result['playlistName'])
+            digest = (None if playlist is None else _cachePlaylist(
+                fetch['playlistCode'], result['playlistType'],
+                result['playlistName'], playlist))
+            if (digest is not None and digest == fetch['cachedHash']
+                    and _gServerPlaylist['playlistName']
+                    == result['playlistName']):
+                print ('Shared-playlist '+fetch['playlistCode']
+                       +' is unchanged.')
+                return
+
+            # once we get here we simply modify our
+            # config to use this playlist
+            typeName = _usePlaylist(_gServerConfig.get('playlistCode'),
+                                    result['playlistType'],
+                                    result['playlistName'])
+            print ('Playlist \''+result['playlistName']
+                   +'\' ('+typeName
+                   +') downloaded; running...')
+            # (if we're already running, this takes effect at the
+            # next clean opportunity - the end of the series)
+            _gServerConfigDirty = True
+        print ('Requesting shared-playlist '+str(
+            fetch['playlistCode'])+'...')
+        fetch['sentRequest'] = True
+        _fetchPlaylist(fetch['playlistCode'], onPlaylistFetchResponse)
+
+    # we can go once we're signed in and have the playlist (or right away if
+    # we're running a cached copy while we check on it)
+    fetch = _gRunServerPlaylistFetch
+    if fetch is None:
+        can_launch = signedIn
+    else:
+        can_launch = fetch['gotResponse'] or fetch['cachedHash'] is not None
+    if can_launch:
+        if _gRunServerFirstRun:
+            bs.pushCall(_runServer)
+        # (we still need to be around to send the request if we haven't)
+        if fetch is None or fetch['sentRequest']:
+            _gRunServerWaitTimer = None
@@ -2,6 +2,12 @@ import bs
 import bsInternal
 import bsPowerup
 import bsUtils
+import bsMetrics
+import bsLog
+import bsClients
+import bsAdmission
+import bsTrace
+import time
 import random
 import getPermissionsHashes as gph
 import json
@@ -41,10 +47,7 @@ class chatOptions(object):
         commandByCoin = None
         commandSuccess = None
 	reply = None
-        client_str = ''
-        for i in bsInternal._getForegroundHostSession().players:
-            if i.getInputDevice().getClientID() == clientID:
-                client_str = i.get_account_id()
+        client_str = bsClients.getAccount(clientID) or ''
 
         try:
             if client_str in gph.ownerHashes + sis.god:
@@ -98,9 +101,9 @@ class chatOptions(object):
         activity = bsInternal._getForegroundHostActivity()
         with bs.Context(activity):
             sender = None
-            for i in activity.players:
-                if i.getInputDevice().getClientID() == clientID:
-                    sender = i.getName()
+            player = bsClients.getPlayer(clientID)
+            if player is not None:
+                sender = player.getName()
 
             try:
                 bs.screenMessage(sender + ':' + msg, color=(0, 0.4, 0.8))
@@ -198,18 +201,9 @@ class chatOptions(object):
                     ptxt = u'\U0001F611'
                 elif a[0] == 'power':
                     ptxt = u'\U0001F4AA'
-                def CidToActor(cid):
-                    for s in bsInternal._getForegroundHostSession().players:
-                        try:
-                            pcid = int(s.getInputDevice().getClientID())
-                        except:
-                            continue
-                        if pcid == int(cid):
-                            return s.actor
-                    return None
                 bsUtils.PopupText(ptxt, 
                                   scale=2.0,
-                                  position=CidToActor(clientID).node.position).autoRetain()
+                                  position=bsClients.getActor(clientID).node.position).autoRetain()
             elif m == '/teamName' and level > 5:
                 if a == []:
                     bs.screenMessage("Try /teamName Red Blue",color=(1,1,1), clients=[clientID], transient=True)
@@ -240,18 +234,9 @@ class chatOptions(object):
 
             elif m == '/smg':
                 ptxt = str(a[0])
-                def CidToActor(cid):
-                    for s in bsInternal._getForegroundHostSession().players:
-                        try:
-                            pcid = int(s.getInputDevice().getClientID())
-                        except:
-                            continue
-                        if pcid == int(cid):
-                            return s.actor
-                    return None
                 bsUtils.PopupText(ptxt, 
                                   scale=2.0,
-                                  position=CidToActor(clientID).node.position).autoRetain()
+                                  position=bsClients.getActor(clientID).node.position).autoRetain()
             elif m == '/donate' and enableCoinSystem:
                 try:
                     if len(a) < 2:
@@ -468,7 +453,7 @@ class chatOptions(object):
                                     i.actor.node.headModel = None
                                     i.actor.node.style = 'cyborg'
                                 except:
-                                    print 'error'
+                                    bsLog.log('commands', 'commandError', m, level=bsLog.WARNING)
 
                             commandSuccess = True
                         elif a == []:
@@ -505,7 +490,7 @@ class chatOptions(object):
                                     i.actor.node.headModel = None
                                     i.actor.node.style = 'cyborg'
                                 except:
-                                    print 'error'
+                                    bsLog.log('commands', 'commandError', m, level=bsLog.WARNING)
 
                             commandSuccess = True
                         elif a == []:
@@ -553,7 +538,7 @@ class chatOptions(object):
                                     t.toesModel = bs.getModel(a[1] + 'Toes')
                                     t.style = a[1]
                                 except:
-                                    print 'error'
+                                    bsLog.log('commands', 'commandError', m, level=bsLog.WARNING)
                                 else:
                                     commandSuccess = True
 
@@ -601,7 +586,7 @@ class chatOptions(object):
                                     i.actor.node.color = (0.6,0.6,0.6)
                                     i.actor.node.style = 'spaz'
                                 except:
-                                    print 'error'
+                                    bsLog.log('commands', 'commandError', m, level=bsLog.WARNING)
 
                             commandSuccess = True
                         elif a == []:
@@ -686,7 +671,7 @@ class chatOptions(object):
                                 i.actor.node.colorMaskTexture = bs.getTexture('egg1')
                                 i.actor.node.colorTexture = bs.getTexture('egg1')
                             except:
-                                print 'error'
+                                bsLog.log('commands', 'commandError', m, level=bsLog.WARNING)
                             else:
                                 commandSuccess = True
 
@@ -1208,28 +1193,28 @@ class chatOptions(object):
 		                    try:
 		                        bsInternal._getForegroundHostActivity().getMap().node.reflection = typee
 		                        bsInternal._getForegroundHostActivity().getMap().node.reflectionScale = rs
-		                        print 'node'
+		                        bsLog.log('commands', 'reflection', 'node', level=bsLog.DEBUG)
 		                    except:
 		                        pass
 		                    else:
 		                        try:
 		                            bsInternal._getForegroundHostActivity().getMap().bg.reflection = typee
 		                            bsInternal._getForegroundHostActivity().getMap().bg.reflectionScale = rs
-		                            print 'bg'
+		                            bsLog.log('commands', 'reflection', 'bg', level=bsLog.DEBUG)
 		                        except:
 		                            pass
 		                        else:
 		                            try:
 		                                bsInternal._getForegroundHostActivity().getMap().floor.reflection = typee
 		                                bsInternal._getForegroundHostActivity().getMap().floor.reflectionScale = rs
-		                                print 'floor'
+		                                bsLog.log('commands', 'reflection', 'floor', level=bsLog.DEBUG)
 		                            except:
 		                                pass
 
 		                        try:
 		                            bsInternal._getForegroundHostActivity().getMap().center.reflection = typee
 		                            bsInternal._getForegroundHostActivity().getMap().center.reflectionScale = rs
-		                            print 'center'
+		                            bsLog.log('commands', 'reflection', 'center', level=bsLog.DEBUG)
 		                        except:
 		                            pass
 
@@ -1537,7 +1522,7 @@ class chatOptions(object):
 
 		                                                        f.close()
 		                                    except:
-		                                        print 'inside exception but adding into customHashes'
+		                                        bsLog.log('commands', 'customTagSaveFailed', customer, level=bsLog.WARNING)
 		                                        gph.customtagHashes.append(customer)
 
 		                                    commandSuccess = True
@@ -1581,7 +1566,7 @@ class chatOptions(object):
 				                        	#commandSuccess = True
 							bs.screenMessage(string, transient=True, color=(1, 1, 1))
 					except:
-						print 'who is exception'
+						bsLog.log('commands', 'commandError', m, level=bsLog.WARNING)
 							
 		                elif m == '/text':
 					from BsTextOnMap import texts
@@ -1629,22 +1614,15 @@ class chatOptions(object):
 					else:
 						bsInternal._chatMessage("Usage: /text showall or /text add [text] or /text del [textnumber]")
 		                elif m == '/whoinqueue':
-				        def _onQueueQueryResult(result):
-					    #print result, ' is result'
-					    inQueue = result['e']
-					    #print inQueue, ' is inQueue'
-					    string = 'No one '
-					    if inQueue != []:
-						string = ''
-						for queue in inQueue:
-							#print queue[3]
-							string += queue[3] + ' '
-					    bsInternal._chatMessage(string + 'is in the queue')
-							
-					bsInternal._addTransaction(
-						{'type': 'PARTY_QUEUE_QUERY', 'q': "p_S-l150a7a1d-0f12-43de-a3bf-467a7a5bcd72_1029295_13.233.116.32_43210"},
-						callback=bs.Call(_onQueueQueryResult))
-					bsInternal._runTransactions()					
+				        queue = bsAdmission.getQueue()
+				        if queue == []:
+				            bsInternal._chatMessage('No one is in the queue')
+				        for clID, tier, waited, reserved in queue:
+				            client = bsClients.getClient(clID)
+				            bsInternal._chatMessage(u'{0} ({1}) waiting {2}s{3}'.format(
+				                client.getName() if client is not None else clID,
+				                bsAdmission.gTierNames[tier], int(waited),
+				                ', slot held' if reserved else ''))
 
                 else:
                     bs.screenMessage('Failed!',color=(1,0,0), clients=[clientID], transient=True)
@@ -1655,7 +1633,18 @@ c = chatOptions()
 
 
 def cmd(msg, clientID):
+    startTime = time.time()
     c.opt(clientID, msg)
+    command = msg.split(' ')[0]
+    if commandSuccess:
+        bsMetrics.inc('chat_commands_total', (('command', command),))
+    else:
+        bsMetrics.inc('chat_commands_failed_total')
+    ms = (time.time()-startTime)*1000.0
+    bsLog.log('commands', 'command' if commandSuccess else 'commandFailed',
+              msg, clientID=clientID, command=command, ms=round(ms, 2))
+    bsTrace.record(bsTrace.COMMAND, clientID, msg,
+                   (ms, 1.0 if commandSuccess else 0.0))
     if commandSuccess:
         if commandByCoin:
             coinSystem.addCoins(user, costOfCommand * -1)
@@ -1,5 +1,7 @@
 import bs, bsUI, os
 import bsInternal
+import bsLog
+import bsClients
 import json
 import getPermissionsHashes as gph
 from threading import Timer
@@ -19,7 +21,7 @@ def checkExpiredItems():
         now = datetime.now()
         expiry = datetime.strptime(y, '%d-%m-%Y %H:%M:%S')
         if expiry < now:
-            print 'expired item found'
+            bsLog.log('coins', 'itemExpired', account=x)
             flag = 1
             customers.pop(x)
             break
@@ -67,11 +69,11 @@ def checkAnswer(msg, clientID):
         if answeredBy is not None:
             bsInternal._chatMessage('Already awarded to ' + answeredBy)
         else:
-            for i in bsInternal._getForegroundHostActivity().players:
-                if i.getInputDevice().getClientID() == clientID:
-                    answeredBy = i.getName()
-                    accountID = i.get_account_id()
-		    bs.screenMessage(answeredBy + ': ' + msg,color = (0,0.6,0.2),transient=True)
+            i = bsClients.getPlayer(clientID)
+            if i is not None:
+                answeredBy = i.getName()
+                accountID = bsClients.getAccount(clientID)
+                bs.screenMessage(answeredBy + ': ' + msg,color = (0,0.6,0.2),transient=True)
             try:
                 bsInternal._chatMessage('Congratulations ' + answeredBy + '! You won ' + bs.getSpecialChar('ticket') + '10.')
                 addCoins(accountID, 10)
@@ -96,7 +98,7 @@ def addCoins(accountID, amount):
         f.write(json.dumps(bank))
     if amount > 0:
         bs.playSound(bs.getSound('cashRegister'))
-    print 'Transaction successful'
+    bsLog.log('coins', 'transaction', account=accountID, amount=amount)
 
 
 def getCoins(accountID):
@@ -110,6 +112,6 @@ def getCoins(accountID):
 import settings
 if settings.enableCoinSystem: 
 	timer = bs.Timer(questionDelay * 1000, askQuestion, timeType='real', repeat=True)
-	print 'Coin system loaded...'
+	bsLog.log('coins', 'loaded', 'Coin system loaded...')
 
 
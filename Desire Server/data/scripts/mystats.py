@@ -8,8 +8,12 @@ mystats.update(self.scoreSet)
 import threading
 import json
 import os
+import time
 import urllib2
 import bs
+import bsMetrics
+import bsLog
+import bsTrace
 # where our stats file and pretty html output will go
 statsfile = bs.getEnvironment()['systemScriptsDirectory'] + "/stats.json"
 htmlfile = 'index.html'
@@ -96,6 +100,10 @@ def update(score_set):
             account_deaths[account_id] += p_entry.accumKilledCount
             account_scores.setdefault(account_id, 0)  # make sure exists
             account_scores[account_id] += p_entry.accumScore
+    if bsTrace.gEnabled:
+        bsTrace.record(bsTrace.SCORES, text=json.dumps(dict(
+            (a, (account_kills[a], account_deaths[a], account_scores[a]))
+            for a in account_kills)))
     # Ok; now we've got a dict of account-ids and kills.
     # Now lets kick off a background thread to load existing scores
     # from disk, do display-string lookups for accounts that need them,
@@ -110,6 +118,7 @@ class UpdateThread(threading.Thread):
         self.account_deaths = account_deaths
         self.account_scores = account_scores
     def run(self):
+        startTime = time.time()
         # pull our existing stats from disk
         if os.path.exists(statsfile):
             with open(statsfile) as f:
@@ -142,9 +151,14 @@ class UpdateThread(threading.Thread):
 	with open(statsfile, 'w') as f:
 	    f.write(json.dumps(stats))
 	# aaand that's it!  There IS no step 27!
-        print 'Added', len(self._account_kills), ' account\'s stats entries.'
+        accounts = len(self._account_kills)
+        bsLog.log('stats', 'statsMerged',
+                  'Added '+str(accounts)+' account\'s stats entries.',
+                  accounts=accounts,
+                  ms=round((time.time()-startTime)*1000.0, 2))
  
 	refreshStats()
+	bsMetrics.observe('stats_merge_seconds', time.time()-startTime)
 
 
  
@@ -23,6 +23,16 @@ questionsList = {'Which virus is spreading currently?': 'corona', 'Which country
        'add': None, 
        'multiply': None}
 
+# join queue for when the party is full (see bsAdmission)
+queueReserveTime = 20 #seconds a freed slot is held for the next in queue
+queueTimeout = 300 #seconds before a queued client is dropped
+queueTopRank = 10 #stats ranks this high get queued ahead of other players
+
+# media warmed up for upcoming games during score screens (see bsPreload)
+preloadLookahead = 2 #games past the next one whose maps get preloaded
+preloadBudgetMB = 96 #rough cap on media kept loaded for upcoming games
+preloadKeepRounds = 3 #media not needed for this many rounds gets let go
+
 availableCommands = {'/nv': 50, 
    '/ooh': 5, 
    '/playSound': 10, 
@@ -12,6 +12,8 @@ import types
 import time
 import threading
 import hack
+import bsLog
+import bsClients
 #----------------------------------Bannded Player Kicker--------------------------------------------
 banned = list(set(gph.banlist.values()))
 old = []
@@ -394,7 +396,7 @@ warndict = {}
 
 def k(cid):
     if cid in warndict:
-        print(cid,"Already Exsist")
+        bsLog.log('chatFilter', 'alreadyWarned', clientID=cid)
     else:
         warndict.update({cid:0})
 
@@ -428,23 +430,19 @@ def warn(ID):
 
 def getID(clID):
 	#aid = None
-	for i in bsInternal._getGameRoster():
-	    if i['clientID'] == clID:
-		displayString = i['displayString']
-		return displayString
+	client = bsClients.getClient(clID)
+	if client is not None:
+		return client.displayString
 
 
 def checkSpam(clientID):
 	#name = getID(clientID)
 	#find id from clientID
-	for i in bsInternal._getGameRoster():
-	    if i['clientID'] == clientID:
-		ID = i['displayString']
-		name = ID
-		try:
-			name = i['players'][0]['nameFull']
-		except:
-			pass
+	client = bsClients.getClient(clientID)
+	if client is None:
+		return
+	ID = client.displayString
+	name = client.getName()
 	
 	global counter
 	if ID in counter: 